@@ -0,0 +1,20 @@
+-- Adds the lookup indexes the models declare to an existing database
+-- Usage: cat add_indexes.sql | mysql -uroot -p hbnb_dev_db
+
+-- States and cities are listed by name, cities within their state
+CREATE INDEX ix_states_name ON states (name);
+CREATE INDEX ix_cities_name ON cities (name);
+CREATE INDEX ix_cities_state_id_name ON cities (state_id, name);
+
+-- Places are looked up by city and owner, and filtered by price
+CREATE INDEX ix_places_city_id_price_by_night ON places (city_id, price_by_night);
+CREATE INDEX ix_places_price_by_night ON places (price_by_night);
+CREATE INDEX ix_places_user_id ON places (user_id);
+
+-- Reviews are looked up by place and author, amenities by place
+CREATE INDEX ix_reviews_place_id ON reviews (place_id);
+CREATE INDEX ix_reviews_user_id ON reviews (user_id);
+CREATE INDEX ix_place_amenity_amenity_id ON place_amenity (amenity_id);
+
+-- Users are looked up by email
+CREATE INDEX ix_users_email ON users (email);
@@ -1,9 +1,17 @@
 #!/usr/bin/python3
 """ Console Module """
+import argparse
+import ast
 import cmd
+import io
+import json
+import re
 import sys
 import shlex
 import uuid
+from contextlib import redirect_stdout
+from itertools import count
+from time import perf_counter
 from models.base_model import BaseModel
 from models.__init__ import storage
 from models.user import User
@@ -16,6 +24,76 @@ from models import storage
 from os import getenv
 from models.engine.db_storage import DBStorage
 
+# <class name>.<command>(<arguments>)
+DOT_LINE = re.compile(r'(\w+)\.(\w+)\((.*)\)\s*$')
+# an argument: a quoted string, a {dictionary} or a bare word, then an
+# optional comma
+TOKEN = re.compile(r'\s*(?:"((?:[^"\\]|\\.)*)"|(\{.*\})|([^\s,]+))\s*,?')
+# a create parameter: <key>=<value>, the value quoted or bare
+PARAM = re.compile(r'(\w+)=(?:"((?:[^"\\]|\\.)*)"|(\S+))')
+# a find filter: <key><operator><value>, the value quoted or bare
+FILTER = re.compile(r'[\s,]*(\w+)(<=|>=|!=|=|<|>)'
+                    r'(?:"((?:[^"\\]|\\.)*)"|([^\s,]+))[\s,]*')
+INTEGER = re.compile(r'-?\d+$')
+FLOAT = re.compile(r'-?\d+\.\d+$')
+ESCAPE = re.compile(r'\\(.)')
+
+
+def tokenize(text):
+    """Splits command arguments into values: quoted strings unquoted,
+    dictionaries read with ast.literal_eval, bare words as they are"""
+    values = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = TOKEN.match(text, pos)
+        if not match or match.end() == pos:
+            break
+        quoted, mapping, word = match.groups()
+        if quoted is not None:
+            values.append(ESCAPE.sub(r'\1', quoted))
+        elif mapping is not None:
+            try:
+                values.append(ast.literal_eval(mapping))
+            except (ValueError, SyntaxError):
+                values.append(mapping)
+        else:
+            values.append(word)
+        pos = match.end()
+    return values
+
+
+def param_value(quoted, bare):
+    """Returns the value of a quoted or bare parameter: quoted strings
+    with underscores as spaces, bare numbers as numbers"""
+    if quoted:
+        return ESCAPE.sub(r'\1', quoted).replace('_', ' ')
+    if INTEGER.match(bare):
+        return int(bare)
+    if FLOAT.match(bare):
+        return float(bare)
+    return bare.replace('_', ' ')
+
+
+def filter_value(quoted, bare):
+    """Returns the value of a quoted or bare find filter: quoted strings
+    as written, bare numbers as numbers, other bare words as they are"""
+    if quoted is not None:
+        return ESCAPE.sub(r'\1', quoted)
+    if INTEGER.match(bare):
+        return int(bare)
+    if FLOAT.match(bare):
+        return float(bare)
+    return bare
+
+
+def quote(value):
+    """Formats a value so tokenize reads it back unchanged"""
+    if isinstance(value, dict):
+        return repr(value)
+    return '"{}"'.format(str(value).replace('\\', '\\\\')
+                         .replace('"', '\\"'))
+
 
 class HBNBCommand(cmd.Cmd):
     """ Contains the functionality for the HBNB console"""
@@ -32,7 +110,7 @@ class HBNBCommand(cmd.Cmd):
         'Amenity': Amenity,
         'Review': Review
         }
-    dot_commands = ['all', 'count', 'show', 'destroy', 'update']
+    dot_commands = ['all', 'count', 'show', 'destroy', 'update', 'find']
     types = {
         'number_rooms': int,
         'number_bathrooms': int,
@@ -53,50 +131,32 @@ class HBNBCommand(cmd.Cmd):
         Usage: <class name>.<command>([<id> [<*args> or <**kwargs>]])
         (Brackets denote optional fields in usage example.)
         """
-        _cmd = _cls = _id = _args = ''  # initialize line elements
-
-        # scan for general formating - i.e '.', '(', ')'
-        if not ('.' in line and '(' in line and ')' in line):
+        match = DOT_LINE.match(line)
+        if not match:
             return line
-
-        try:  # parse line left to right
-            pline = line[:]  # parsed line
-
-            # isolate <class name>
-            _cls = pline[:pline.find('.')]
-
-            # isolate and validate <command>
-            _cmd = pline[pline.find('.') + 1:pline.find('(')]
-            if _cmd not in HBNBCommand.dot_cmds:
-                raise Exception
-
-            # if parantheses contain arguments, parse them
-            pline = pline[pline.find('(') + 1:pline.find(')')]
-            if pline:
-                # partition args: (<id>, [<delim>], [<*args>])
-                pline = pline.partition(', ')  # pline convert to tuple
-
-                # isolate _id, stripping quotes
-                _id = pline[0].replace('\"', '')
-                # possible bug here:
-                # empty quotes register as empty _id when replaced
-
-                # if arguments exist beyond _id
-                pline = pline[2].strip()  # pline is now str
-                if pline:
-                    # check for *args or **kwargs
-                    if pline[0] == '{' and pline[-1] == '}'\
-                            and type(eval(pline)) is dict:
-                        _args = pline
-                    else:
-                        _args = pline.replace(',', '')
-                        # _args = _args.replace('\"', '')
-            line = ' '.join([_cmd, _cls, _id, _args])
-
-        except Exception as mess:
-            pass
-        finally:
+        _cls, _cmd, _args = match.groups()
+        if _cmd not in HBNBCommand.dot_commands:
             return line
+        if _cmd == 'find':  # filters are read as they are
+            return ' '.join([_cmd, _cls, _args])
+        args = tokenize(_args)
+        if not args:
+            return ' '.join([_cmd, _cls])
+        # the id stays bare for show and destroy, the rest is quoted
+        rest = ' '.join([_cls, str(args[0])] +
+                        [quote(arg) for arg in args[1:]])
+        # keep the values so the command does not parse them again
+        self.parsed = (rest, [_cls] + args)
+        return _cmd + ' ' + rest
+
+    def arguments(self, args):
+        """Returns the values of the arguments of a command, as parsed
+        by precmd or else by tokenize"""
+        parsed = getattr(self, 'parsed', None)
+        self.parsed = None
+        if parsed is not None and parsed[0] == args:
+            return parsed[1]
+        return tokenize(args)
 
     def postcmd(self, stop, line):
         """Prints if isatty is false"""
@@ -104,6 +164,53 @@ class HBNBCommand(cmd.Cmd):
             print('(hbnb) ', end='')
         return stop
 
+    def run_script(self, path, flush_every=0):
+        """Runs the commands of a script file without prompts, saving
+        storage once at the end, or every flush_every commands. Lines
+        whose command fails are reported with the throughput on stderr.
+        Returns 1 if a line failed, 0 otherwise"""
+        failed = []
+        commands = 0
+        start = perf_counter()
+        with open(path, encoding='utf-8') as f:
+            lines = zip(count(1), f)
+            finished = False
+            while not finished:
+                # one batch per flush: saves are deferred to its end
+                with storage.batch():
+                    for number, line in lines:
+                        line = line.strip()
+                        if not line or line.startswith('#'):
+                            continue
+                        commands += 1
+                        out = io.StringIO()
+                        try:
+                            with redirect_stdout(out):
+                                stop = self.onecmd(self.precmd(line))
+                        except Exception as error:
+                            stop = False
+                            out.write("** {!r} **\n".format(error))
+                        sys.stdout.write(out.getvalue())
+                        errors = [text for text in out.getvalue().split('\n')
+                                  if text.startswith('** ')]
+                        if errors:
+                            failed.append((number, line, errors[0]))
+                        if stop:
+                            finished = True
+                            break
+                        if flush_every and commands % flush_every == 0:
+                            break
+                    else:
+                        finished = True
+        elapsed = perf_counter() - start
+        for number, line, error in failed:
+            print("line {}: {}: {}".format(number, line, error),
+                  file=sys.stderr)
+        print("{} commands in {:.3f}s ({:.0f}/s), {} failed".format(
+            commands, elapsed, commands / elapsed if elapsed else 0,
+            len(failed)), file=sys.stderr)
+        return 1 if failed else 0
+
     def do_quit(self, command):
         """ Method to exit the HBNB console"""
         return True
@@ -135,22 +242,9 @@ class HBNBCommand(cmd.Cmd):
         if class_name not in HBNBCommand.classes:
             print("** class doesn't exist **")
             return
-        kwargs = {}
-        parameters = args[2]
-        parameters = parameters.split(" ")[:]
-        id = str(uuid.uuid4())
-        kwargs['id'] = id
-        for par in parameters:
-            att_name = par.partition("=")[0]
-            att_value = par.partition("=")[2]
-
-            att_value = att_value.replace('_', ' ')
-            if att_value:
-                # remove double quote if exist
-                if att_value.startswith('"') and att_value.endswith('"'):
-                    att_value = att_value[1:-1]
-                    att_value = str(att_value)
-                kwargs[att_name] = att_value
+        kwargs = {'id': str(uuid.uuid4())}
+        for att_name, quoted, bare in PARAM.findall(args[2]):
+            kwargs[att_name] = param_value(quoted, bare)
         new_instance = HBNBCommand.classes[class_name](**kwargs)
         storage.new(new_instance)
         storage.save()
@@ -183,11 +277,11 @@ class HBNBCommand(cmd.Cmd):
             print("** instance id missing **")
             return
 
-        key = c_name + "." + c_id
-        try:
-            print(storage._FileStorage__objects[key])
-        except KeyError:
+        obj = storage.get(c_name, c_id)
+        if obj is None:
             print("** no instance found **")
+            return
+        print(obj)
 
     def help_show(self):
         """ Help information for the show command """
@@ -214,13 +308,12 @@ class HBNBCommand(cmd.Cmd):
             print("** instance id missing **")
             return
 
-        key = c_name + "." + c_id
-
-        try:
-            del (storage.all()[key])
-            storage.save()
-        except KeyError:
+        obj = storage.get(c_name, c_id)
+        if obj is None:
             print("** no instance found **")
+            return
+        storage.delete(obj)
+        storage.save()
 
     def help_destroy(self):
         """ Help information for the destroy command """
@@ -229,105 +322,159 @@ class HBNBCommand(cmd.Cmd):
 
     def do_all(self, args):
         """ Shows all objects, or all objects of a class"""
-        list_to_print = []
-
-        if args:
-            args = args.split(' ')[0]
-            if args not in HBNBCommand.classes:
-                print("** class doesn't exist **")
+        cls = None
+        options = {'limit': None, 'offset': 0, 'format': 'list'}
+        words = args.split()
+        while words:
+            word = words.pop(0)
+            if not word.startswith('--'):
+                if word not in HBNBCommand.classes:
+                    print("** class doesn't exist **")
+                    return
+                cls = HBNBCommand.classes[word]
+                continue
+            name, _, value = word[2:].partition('=')
+            if not value and words:
+                value = words.pop(0)
+            if name not in options or \
+                    name == 'format' and value not in ('list', 'jsonl') or \
+                    name != 'format' and not value.isdigit():
+                print("** invalid option {} **".format(word))
                 return
-
-            # Retrieve objects from the database using DBStorage
-            objects = storage.all(HBNBCommand.classes[args])
-            for obj in objects.values():
-                list_to_print.append(str(obj))
-        else:
-            # Retrieve all objects from the database using DBStorage
-            objects = storage.all()
-            for obj in objects.values():
-                list_to_print.append(str(obj))
-
-        print(list_to_print)
+            options[name] = value if name == 'format' else int(value)
+
+        self.print_objects(
+            storage.stream(cls, offset=options['offset'],
+                           limit=options['limit']),
+            options['format'] == 'jsonl')
+
+    def print_objects(self, objects, jsonl=False):
+        """Prints (key, object) pairs one at a time, as the repr of a list
+        of their strings or as JSON Lines of their dictionaries"""
+        write = sys.stdout.write
+        if jsonl:
+            for key, obj in objects:
+                write(json.dumps(obj.to_dict()) + '\n')
+            return
+        separator = '['
+        for key, obj in objects:
+            write(separator + repr(str(obj)))
+            separator = ', '
+        write('[]\n' if separator == '[' else ']\n')
 
     def help_all(self):
         """ Help information for the all command """
         print("Shows all objects, or all of a class")
-        print("[Usage]: all <className>\n")
+        print("[Usage]: all [<className>] [--limit=<n>] [--offset=<n>] "
+              "[--format=list|jsonl]\n")
+
+    def do_find(self, args):
+        """ Shows the objects of a class matching attribute filters """
+        c_name, _, args = args.strip().partition(" ")
+        if not c_name:
+            print("** class name missing **")
+            return
+        if c_name not in HBNBCommand.classes:
+            print("** class doesn't exist **")
+            return
+        filters = []
+        pos = 0
+        args = args.strip()
+        while pos < len(args):
+            match = FILTER.match(args, pos)
+            if not match:
+                print("** invalid filter {} **".format(
+                    args[pos:].split()[0]))
+                return
+            att_name, op, quoted, bare = match.groups()
+            filters.append((att_name, op, filter_value(quoted, bare)))
+            pos = match.end()
+        self.print_objects(storage.find(c_name, filters).items())
+
+    def help_find(self):
+        """ Help information for the find command """
+        print("Shows the objects of a class whose attributes match all "
+              "filters, with = != < <= > >=")
+        print("[Usage]: find <className> <attName><op><value> ...\n")
 
     def do_count(self, args):
         """Count current number of class instances"""
-        count = 0
-        for key, value in storage._FileStorage__objects.items():
-            if args == key.split('.')[0]:
-                count += 1
-        print(count)
+        c_name = args.partition(" ")[0]
+        if not c_name:
+            print("** class name missing **")
+            return
+        if c_name not in HBNBCommand.classes:
+            print("** class doesn't exist **")
+            return
+        print(storage.count(c_name))
 
     def help_count(self):
         """ """
         print("Usage: count <class_name>")
 
+    def do_load(self, args):
+        """ Bulk loads objects from a JSON Lines file """
+        path = args.strip()
+        if not path:
+            print("** file name missing **")
+            return
+        try:
+            f = open(path, encoding='utf-8')
+        except OSError:
+            print("** file doesn't exist **")
+            return
+        loaded = 0
+        objs = []
+        with f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    cls = HBNBCommand.classes[record['__class__']]
+                    objs.append(cls(**record))
+                except (ValueError, KeyError, TypeError):
+                    print("** invalid object on line {} **".format(number))
+                    continue
+                # hand objects over in chunks to bound memory
+                if len(objs) == 1000:
+                    loaded += storage.new_many(objs)
+                    objs = []
+        loaded += storage.new_many(objs)
+        storage.save()
+        print(loaded)
+
+    def help_load(self):
+        """ Help information for the load command """
+        print("Bulk loads objects, one to_dict() JSON object per line")
+        print("[Usage]: load <fileName>\n")
+
     def do_update(self, args):
         """ Updates a certain object with new info """
-        c_name = c_id = att_name = att_value = kwargs = ''
-
-        # isolate cls from id/args, ex: (<cls>, delim, <id/args>)
-        args = args.partition(" ")
-        if args[0]:
-            c_name = args[0]
-        else:  # class name not present
+        args = self.arguments(args)
+        if not args:  # class name not present
             print("** class name missing **")
             return
+        c_name = args[0]
         if c_name not in HBNBCommand.classes:  # class name invalid
             print("** class doesn't exist **")
             return
-
-        # isolate id from args
-        args = args[2].partition(" ")
-        if args[0]:
-            c_id = args[0]
-        else:  # id not present
+        if len(args) < 2:  # id not present
             print("** instance id missing **")
             return
+        c_id = args[1]
 
-        # generate key from class and id
-        key = c_name + "." + c_id
-
-        # determine if key is present
-        if key not in storage.all():
+        # determine if the instance exists
+        new_dict = storage.get(c_name, c_id)
+        if new_dict is None:
             print("** no instance found **")
             return
 
-        # first determine if kwargs or args
-        if '{' in args[2] and '}' in args[2] and type(eval(args[2])) is dict:
-            kwargs = eval(args[2])
-            args = []  # reformat kwargs into list, ex: [<name>, <value>, ...]
-            for key, value in kwargs.items():
-                args.append(key)
-                args.append(value)
-        else:  # isolate args
-            args = args[2]
-            if args and args[0] == '\"':  # check for quoted arg
-                second_quote = args.find('\"', 1)
-                att_name = args[1:second_quote]
-                args = args[second_quote + 1:]
-
-            args = args.partition(' ')
-
-            # if att_name was not quoted arg
-            if not att_name and args[0] != ' ':
-                att_name = args[0]
-            # check for quoted val arg
-            if args[2] and args[2][0] == '\"':
-                att_value = args[2][1:args[2].find('\"', 1)]
-
-            # if att_val was not quoted arg
-            if not att_value and args[2]:
-                att_value = args[2].partition(' ')[0]
-
-            args = [att_name, att_value]
-
-        # retrieve dictionary of current objects
-        new_dict = storage.all()[key]
+        # reformat into a list, ex: [<name>, <value>, ...]
+        if len(args) > 2 and isinstance(args[2], dict):
+            args = [item for pair in args[2].items() for item in pair]
+        else:
+            args = (args[2:] + ['', ''])[:2]
 
         # iterate through attr names and values
         for i, att_name in enumerate(args):
@@ -337,15 +484,15 @@ class HBNBCommand(cmd.Cmd):
                 if not att_name:  # check for att_name
                     print("** attribute name missing **")
                     return
-                if not att_value:  # check for att_value
+                if att_value == '':  # check for att_value
                     print("** value missing **")
                     return
                 # type cast as necessary
                 if att_name in HBNBCommand.types:
                     att_value = HBNBCommand.types[att_name](att_value)
 
-                # update dictionary with name, value pair
-                new_dict.__dict__.update({att_name: att_value})
+                # set the attribute so storage sees the object changed
+                setattr(new_dict, att_name, att_value)
 
         new_dict.save()  # save updates to file
 
@@ -356,4 +503,13 @@ class HBNBCommand(cmd.Cmd):
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HBNB console")
+    parser.add_argument('--script', metavar='FILE',
+                        help="run the commands of FILE in one batch")
+    parser.add_argument('--flush-every', metavar='N', type=int, default=0,
+                        help="with --script, save every N commands")
+    options = parser.parse_args()
+    if options.script:
+        sys.exit(HBNBCommand().run_script(options.script,
+                                          options.flush_every))
     HBNBCommand().cmdloop()
@@ -0,0 +1,13 @@
+#!/usr/bin/python3
+""" Converts a storage file between the JSON and binary formats
+
+Usage: ./convert_storage.py file.json file.pickle
+"""
+import sys
+from models.engine.snapshot import convert
+
+if len(sys.argv) != 3:
+    print("Usage: {} <source> <target>".format(sys.argv[0]))
+    sys.exit(1)
+count = convert(sys.argv[1], sys.argv[2])
+print("{} objects written to {}".format(count, sys.argv[2]))
@@ -4,15 +4,18 @@ CREATE TABLE states (
   created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
   updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
   name VARCHAR(128) NOT NULL,
-  PRIMARY KEY(id)
+  PRIMARY KEY(id),
+  KEY ix_states_name (name)
   );
 
 CREATE TABLE cities (
   id VARCHAR(60) NOT NULL,
   created_at datetime NOT NULL DEFAULT CURRENT_TIMESTAMP,
   updated_at datetime NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  name VARCHAR(128) NOT NULL,
   state_id VARCHAR(60) NOT NULL,
   PRIMARY KEY (id),
-  KEY state_id (state_id),
+  KEY ix_cities_name (name),
+  KEY ix_cities_state_id_name (state_id, name),
   CONSTRAINT fk_state_id FOREIGN KEY (state_id) REFERENCES states (id)
   );
@@ -1,12 +1,22 @@
 #!/usr/bin/python3
 """This module defines a base class for all models in our hbnb clone"""
 import uuid
+import models
 from datetime import datetime
 from sqlalchemy import Column, String, DateTime
 from sqlalchemy.ext.declarative import declarative_base
 
 
 Base = declarative_base()
+# old value passed to storage.touch for an attribute that was not set
+UNSET = object()
+
+
+def parse_time(value):
+    """Returns the datetime for an ISO 8601 string from to_dict"""
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
 
 
 class BaseModel:
@@ -18,20 +28,33 @@ class BaseModel:
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow())
     updated_at = Column(DateTime, nullable=False, default=datetime.utcnow())
 
-    def __init__(self, **kwargs):
-        self.id = str(uuid.uuid4())
-        self.created_at = datetime.utcnow()
-        self.updated_at = datetime.utcnow()
-
+    def __init__(self, *args, **kwargs):
+        """Instantiates a new model, or rebuilds one from to_dict output"""
+        if 'id' not in kwargs:
+            self.id = str(uuid.uuid4())
+        created = kwargs.get('created_at')
         if 'created_at' in kwargs:
-            kwargs['created_at'] = datetime.strptime(
-                kwargs['created_at'], '%Y-%m-%dT%H:%M:%S.%f')
+            kwargs['created_at'] = parse_time(created)
+        else:
+            self.created_at = datetime.utcnow()
         if 'updated_at' in kwargs:
-            kwargs['updated_at'] = datetime.strptime(
-                kwargs['updated_at'], '%Y-%m-%dT%H:%M:%S.%f')
+            if created is not None and kwargs['updated_at'] == created:
+                # saved untouched: reuse the datetime parsed above
+                kwargs['updated_at'] = kwargs['created_at']
+            else:
+                kwargs['updated_at'] = parse_time(kwargs['updated_at'])
+        else:
+            self.updated_at = datetime.utcnow()
+        kwargs.pop('__class__', None)
 
         self.__dict__.update(kwargs)
 
+    def __setattr__(self, name, value):
+        """Sets an attribute and lets storage update its indexes"""
+        old = self.__dict__.get(name, UNSET)
+        super().__setattr__(name, value)
+        models.storage.touch(self, name, old)
+
     def __str__(self):
         """Returns a string representation of the instance"""
         cls = (str(type(self)).split('.')[-1]).split('\'')[0]
@@ -1,6 +1,6 @@
 #!/usr/bin/python3
 """ City Module for HBNB project """
-from sqlalchemy import Column, String, ForeignKey
+from sqlalchemy import Column, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from models.base_model import BaseModel, Base
 from os import getenv
@@ -9,8 +9,10 @@ from os import getenv
 class City(BaseModel, Base):
     """ The city class, contains state ID and name """
     __tablename__ = 'cities'
+    # a state's cities, already in name order
+    __table_args__ = (Index('ix_cities_state_id_name', 'state_id', 'name'),)
 
-    name = Column(String(128), nullable=False)
+    name = Column(String(128), nullable=False, index=True)
     state_id = Column(String(60), ForeignKey('states.id'), nullable=False)
 
     if getenv("HBNB_TYPE_STORAGE") == "db":
@@ -0,0 +1,197 @@
+#!/usr/bin/python3
+"""Attribute indexes for FileStorage: for one attribute of one class, a
+hash of value -> keys answering equality and, for numbers and for text,
+a sorted list of (value, key) answering ranges and ordering; text is
+ordered ignoring case, as Jinja's sort filter does, from a second list
+of (lowercased value, key)."""
+from bisect import bisect_left, bisect_right, insort
+
+
+class _Top:
+    """Sorts after every key, so (value, TOP) follows all (value, key)"""
+
+    def __lt__(self, other):
+        """Nothing is greater"""
+        return False
+
+    def __gt__(self, other):
+        """Everything is smaller"""
+        return True
+
+
+TOP = _Top()
+
+
+# the order of the kinds of values: numbers, text, then unordered ones
+GROUPS = ('number', 'text', None)
+
+
+def kind(value):
+    """Returns the group of values that value is ordered with: 'number',
+    'text', or None when it is not ordered"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return 'number'
+    if isinstance(value, str):
+        return 'text'
+    return None
+
+
+def order_value(value):
+    """Returns what value is ordered by: text lowercased, so the order
+    ignores case, and anything else as it is"""
+    return value.lower() if isinstance(value, str) else value
+
+
+class AttrIndex:
+    """Index of the values of one attribute; objects where it is unset,
+    None or unhashable never match, and are ordered after all others"""
+
+    def __init__(self, attr):
+        """Starts an empty index of attr"""
+        self.attr = attr
+        self.values = {}
+        self.hashed = {}
+        self.sorted = {}
+        self.folded = []
+        self.unordered = []
+
+    @classmethod
+    def build(cls, attr, objects):
+        """Returns the index of attr over the (key, obj) pairs objects,
+        sorting each group once rather than inserting key by key"""
+        index = cls(attr)
+        for key, obj in objects:
+            group, value = index.__hash(key, obj)
+            if group:
+                index.sorted.setdefault(group, []).append((value, key))
+                if group == 'text':
+                    index.folded.append((value.lower(), key))
+            else:
+                index.unordered.append(key)
+        for entries in index.sorted.values():
+            entries.sort()
+        index.folded.sort()
+        index.unordered.sort()
+        return index
+
+    def add(self, key, obj):
+        """Files key under the current value of the attribute of obj"""
+        self.discard(key)
+        group, value = self.__hash(key, obj)
+        if group:
+            insort(self.sorted.setdefault(group, []), (value, key))
+            if group == 'text':
+                insort(self.folded, (value.lower(), key))
+        else:
+            insort(self.unordered, key)
+
+    def __hash(self, key, obj):
+        """Files key in the hash under the value of the attribute of obj
+        and returns the group and value it is ordered by"""
+        value = getattr(obj, self.attr, None)
+        if value is not None:
+            try:
+                self.hashed.setdefault(value, set()).add(key)
+                self.values[key] = value
+            except TypeError:
+                pass
+        return kind(value), value
+
+    def discard(self, key):
+        """Removes key from the index"""
+        if key in self.values:
+            value = self.values.pop(key)
+            keys = self.hashed[value]
+            keys.discard(key)
+            if not keys:
+                del self.hashed[value]
+            group = kind(value)
+            if group:
+                entries = self.sorted[group]
+                del entries[bisect_left(entries, (value, key))]
+                if group == 'text':
+                    entries = self.folded
+                    del entries[bisect_left(entries, (value.lower(), key))]
+                return
+        i = bisect_left(self.unordered, key)
+        if i < len(self.unordered) and self.unordered[i] == key:
+            del self.unordered[i]
+
+    def find(self, op, value):
+        """Returns the set of keys whose value compares to value with op,
+        one of = != < <= > >="""
+        if op == '=':
+            try:
+                return set(self.hashed.get(value, ()))
+            except TypeError:
+                return set()
+        if op == '!=':
+            return {key for key, other in self.values.items()
+                    if other != value}
+        entries = self.sorted.get(kind(value), [])
+        if op == '<':
+            entries = entries[:bisect_left(entries, (value,))]
+        elif op == '<=':
+            entries = entries[:bisect_right(entries, (value, TOP))]
+        elif op == '>':
+            entries = entries[bisect_right(entries, (value, TOP)):]
+        elif op == '>=':
+            entries = entries[bisect_left(entries, (value,)):]
+        else:
+            raise ValueError("Unknown operator: {}".format(op))
+        return {key for other, key in entries}
+
+    def ordered(self, reverse=False, after=None, keys=None):
+        """Yields keys by (value, key), numbers before text, text ignoring
+        case, and keys with no such value last, from just past the
+        (value, key) pair after if given, and only those in the set keys
+        if given; reverse walks the other way"""
+        if after is not None and kind(after[0]) is None:
+            after = (None, after[1])
+        if keys is not None and len(keys) * 4 < len(self.values):
+            # a few candidates: sort them rather than walk everything
+            yield from self.__ordered_subset(reverse, after, keys)
+            return
+        groups = list(reversed(GROUPS) if reverse else GROUPS)
+        if after is not None:
+            groups = groups[groups.index(kind(after[0])):]
+        for group in groups:
+            if group == 'text':
+                entries = self.folded
+            elif group:
+                entries = self.sorted.get(group, [])
+            else:
+                entries = self.unordered
+            if after is None or not group:
+                bound = after and after[1]
+            else:
+                bound = (order_value(after[0]), after[1])
+            start = after is not None and kind(after[0]) == group
+            if reverse:
+                end = bisect_left(entries, bound) if start else len(entries)
+                positions = range(end - 1, -1, -1)
+            else:
+                begin = bisect_right(entries, bound) if start else 0
+                positions = range(begin, len(entries))
+            for i in positions:
+                key = entries[i][1] if group else entries[i]
+                if keys is None or key in keys:
+                    yield key
+
+    def __ordered_subset(self, reverse, after, keys):
+        """Does the work of ordered for a small set of keys"""
+        def rank(value, key):
+            """Returns the sort key of (value, key)"""
+            group = kind(value)
+            return GROUPS.index(group), order_value(value) if group else 0, key
+
+        entries = sorted((rank(self.values.get(key), key) for key in keys),
+                         reverse=reverse)
+        if after is not None:
+            bound = rank(*after)
+            entries = [entry for entry in entries
+                       if (entry < bound if reverse else entry > bound)]
+        for entry in entries:
+            yield entry[2]
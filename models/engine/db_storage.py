@@ -4,11 +4,15 @@ Module for database storage
 """
 
 
-from sqlalchemy import create_engine
+from sqlalchemy import String, and_, create_engine, event, func, insert
+from sqlalchemy import or_
+from contextlib import contextmanager
 from os import getenv
-import sys
+import operator
 from models.base_model import Base
 from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm import make_transient_to_detached
 from models.state import State
 from models.city import City
 from models.user import User
@@ -17,14 +21,45 @@ from models.review import Review
 from models.amenity import Amenity
 
 
+def _sqlite_pragmas(connection, record):
+    """
+    Tune each new SQLite connection: write-ahead logging so readers do
+    not block the writer, fsync only at checkpoints, memory-mapped reads
+    """
+    cursor = connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA mmap_size={:d}".format(
+        int(getenv("HBNB_SQLITE_MMAP_SIZE", 1 << 28))))
+    cursor.close()
+
+
 class DBStorage:
+    """
+    Stores the models in a SQL database through SQLAlchemy
+    """
 
     __engine = None
     __session = None
+    # eager-loading presets for all(load=...) and get(load=...), built
+    # lazily: the relationships only exist in db mode
+    __loads = {
+        'cities': lambda: [selectinload(State.cities)],
+        'place': lambda: [joinedload(Place.user),
+                          selectinload(Place.reviews)
+                          .joinedload(Review.user),
+                          selectinload(Place.amenities)]
+    }
+    # find() operators as SQL expression builders
+    __operators = {'=': operator.eq, '!=': operator.ne,
+                   '<': operator.lt, '<=': operator.le,
+                   '>': operator.gt, '>=': operator.ge}
 
-    def __init__(self):
+    def __init__(self, url=None):
         """
-        Initialize DBStorage class
+        Initialize DBStorage class on the database url, HBNB_DB_URL
+        (e.g. sqlite:///hbnb.db) or the MySQL database of the
+        HBNB_MYSQL_* variables
         """
         user = getenv("HBNB_MYSQL_USER")
         passwd = getenv("HBNB_MYSQL_PWD")
@@ -32,32 +67,205 @@ class DBStorage:
         database = getenv("HBNB_MYSQL_DB")
         env = getenv("HBNB_ENV")
 
-        self.__engine = create_engine(
-            f"mysql+mysqldb://{user}:{passwd}@{host}/{database}",
-            pool_pre_ping=True)
+        if url is None:
+            url = getenv("HBNB_DB_URL")
+        if url is None:
+            url = f"mysql+mysqldb://{user}:{passwd}@{host}/{database}"
+        self.__engine = create_engine(url, **self.__engine_options())
+        if self.__engine.dialect.name == "sqlite":
+            event.listen(self.__engine, "connect", _sqlite_pragmas)
         if env == "test":
             Base.metadata.drop_all(self.__engine)
 
-    def all(self, cls=None):
+    def __engine_options(self):
+        """
+        Return the create_engine pool settings of the HBNB_DB_*
+        variables; unset ones keep the SQLAlchemy defaults
+        """
+        options = {
+            'pool_pre_ping': getenv("HBNB_DB_POOL_PRE_PING", "1") == "1"
+        }
+        for name, env in (('pool_size', "HBNB_DB_POOL_SIZE"),
+                          ('max_overflow', "HBNB_DB_MAX_OVERFLOW"),
+                          ('pool_recycle', "HBNB_DB_POOL_RECYCLE"),
+                          ('pool_timeout', "HBNB_DB_POOL_TIMEOUT")):
+            if getenv(env):
+                options[name] = int(getenv(env))
+        if getenv("HBNB_DB_ISOLATION_LEVEL"):
+            options['isolation_level'] = getenv("HBNB_DB_ISOLATION_LEVEL")
+        return options
+
+    def pool_stats(self):
+        """
+        Return the connection pool's class, size and connection counts
+        """
+        pool = self.__engine.pool
+        stats = {'pool': type(pool).__name__}
+        for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+            if hasattr(pool, name):
+                stats[name] = getattr(pool, name)()
+        return stats
+
+    def __classes(self, cls=None):
         """
-        Query all objects
+        Return [cls], resolving a class name, all model classes, or []
+        for a class that is not mapped to a table, such as BaseModel
         """
-        obj_dict = {}
+        classes = [User, State, City, Place, Review, Amenity]
         if cls:
             if isinstance(cls, str):
-                cls = getattr(sys.modules[__name__], cls)
-            query = self.__session.query(cls)
-            for obj in query:
-                key = f"{type(obj).__name__}.{obj.id}"
-                obj_dict[key] = obj
+                return [c for c in classes if c.__name__ == cls]
+            return [cls] if cls in classes else []
+        return classes
+
+    def __mapped(self, cls):
+        """
+        Return the model class cls names, or None if it has no table
+        """
+        classes = self.__classes(cls)
+        return classes[0] if classes else None
+
+    def __options(self, load=None):
+        """
+        Return the loader options of a preset name, or load itself
+        """
+        if isinstance(load, str):
+            return DBStorage.__loads[load]()
+        return list(load or ())
+
+    def all(self, cls=None, load=None):
+        """
+        Query all objects; load is a preset name or a list of loader
+        options for cls, so relationships are fetched in a fixed
+        number of queries instead of one per object
+        """
+        return dict(self.stream(cls, load=load))
+
+    def stream(self, cls=None, chunk=1000, load=None, offset=0,
+               limit=None):
+        """
+        Yield (key, object) pairs of all objects, or of one class,
+        fetching chunk rows at a time from a server-side cursor
+        instead of loading whole tables in memory. Rows come in id
+        order, so pages line up with the full listing: with an offset or
+        a limit the database skips offset of them (OFFSET) and stops
+        after limit (LIMIT)
+        """
+        options = self.__options(load)
+        for cls in self.__classes(cls):
+            if limit is not None and limit <= 0:
+                return
+            query = self.__session.query(cls).options(*options)
+            query = query.order_by(cls.id)
+            if offset or limit is not None:
+                if offset:
+                    # skip whole classes without reading their rows
+                    size = self.count(cls)
+                    if offset >= size:
+                        offset -= size
+                        continue
+                query = query.offset(offset)
+                offset = 0
+                if limit is not None:
+                    query = query.limit(limit)
+            prefix = cls.__name__ + '.'
+            for obj in query.yield_per(chunk):
+                if limit is not None:
+                    limit -= 1
+                yield prefix + obj.id, obj
+
+    def get(self, cls, id, load=None):
+        """
+        Return the object of class cls with that id, or None, by primary
+        key from the session identity map or a single-row SELECT
+        """
+        cls = self.__mapped(cls)
+        if cls is None:
+            return None
+        return self.__session.get(cls, id, options=self.__options(load))
+
+    def count(self, cls=None):
+        """
+        Count the objects of one class, or of all, with SELECT COUNT(*)
+        """
+        return sum(self.__session.query(func.count()).select_from(cls)
+                   .scalar() for cls in self.__classes(cls))
+
+    def find(self, cls, filters):
+        """
+        Return the objects of cls matching every (attribute, operator,
+        value) filter, the operator one of = != < <= > >=, with the
+        filters as the WHERE clause of one SELECT; filters on an
+        attribute that is not a column match nothing, as in FileStorage
+        """
+        cls = self.__mapped(cls)
+        query = None if cls is None else self.__filtered(cls, filters)
+        if query is None:
+            return {}
+        return {cls.__name__ + '.' + obj.id: obj for obj in query}
+
+    def query(self, cls, where=(), order_by='id', limit=None, after=None,
+              load=None):
+        """
+        Return the list of cls objects matching where, filters as for
+        find or a dict of attribute: value, in the order of the column
+        order_by ('-' in front for descending, ties broken by id), from
+        just past after, the last object of the previous page or its
+        (value, id), and at most limit of them, all in one SELECT with
+        WHERE, ORDER BY and LIMIT; keyset pagination, so a page costs
+        the same however deep it is. Text is ordered ignoring case,
+        by lower(), and rows where order_by is NULL come last as if it
+        were the largest value, as in FileStorage
+        """
+        cls = self.__mapped(cls)
+        if cls is None:
+            return []
+        if isinstance(where, dict):
+            where = [(attr, '=', value) for attr, value in where.items()]
+        reverse = order_by.startswith('-')
+        attr = order_by.lstrip('-')
+        query = self.__filtered(cls, where)
+        if query is None or attr not in cls.__table__.columns:
+            return []
+        column = getattr(cls, attr)
+        null = column.is_(None)
+        text = isinstance(column.type, String)
+        key = func.lower(column) if text else column
+        if after is not None:
+            if not isinstance(after, tuple):
+                after = (getattr(after, attr, None), after.id)
+            past = operator.lt if reverse else operator.gt
+            if after[0] is None:
+                keyset = and_(null, past(cls.id, after[1]))
+                if reverse:
+                    keyset = or_(keyset, column.isnot(None))
+            else:
+                value = after[0].lower() if text else after[0]
+                keyset = or_(past(key, value),
+                             and_(key == value, past(cls.id, after[1])))
+                if not reverse:
+                    keyset = or_(keyset, null)
+            query = query.filter(keyset)
+        if reverse:
+            query = query.order_by(null.desc(), key.desc(), cls.id.desc())
         else:
-            classes = [User, State, City, Place, Review, Amenity]
-            for cls in classes:
-                query = self.__session.query(cls)
-                for obj in query:
-                    key = f"{type(obj).__name__}.{obj.id}"
-                    obj_dict[key] = obj
-        return obj_dict
+            query = query.order_by(null, key, cls.id)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.options(*self.__options(load)).all()
+
+    def __filtered(self, cls, filters):
+        """
+        Return the query of cls with filters as its WHERE clause, or
+        None when one is on an attribute that is not a column
+        """
+        query = self.__session.query(cls)
+        for attr, op, value in filters:
+            if attr not in cls.__table__.columns:
+                return None
+            query = query.filter(
+                DBStorage.__operators[op](getattr(cls, attr), value))
+        return query
 
     def new(self, obj):
         """
@@ -65,10 +273,53 @@ class DBStorage:
         """
         self.__session.add(obj)
 
+    def new_many(self, objs, chunk=1000):
+        """
+        Insert objects with one executemany INSERT per chunk rows of a
+        table instead of one INSERT per object; only their columns are
+        written (not relationships), parents before children, and the
+        next save() commits them. The objects then join the session as
+        already stored, so later changes to them are UPDATEs. Return the
+        number of objects
+        """
+        objs = list(objs)
+        rows = {}
+        for obj in objs:
+            table = type(obj).__table__
+            rows.setdefault(table, []).append(self.__row(obj, table))
+        for table in Base.metadata.sorted_tables:
+            table_rows = rows.get(table, [])
+            for i in range(0, len(table_rows), chunk):
+                self.__session.execute(insert(table),
+                                       table_rows[i:i + chunk])
+        for obj in objs:
+            make_transient_to_detached(obj)
+            self.__session.add(obj)
+        return len(objs)
+
+    def __row(self, obj, table):
+        """
+        Return the column values of obj, setting unset ones on obj to
+        their default
+        """
+        row = {}
+        for column in table.columns:
+            value = getattr(obj, column.key, None)
+            default = column.default
+            if value is None and default is not None and default.is_scalar:
+                value = default.arg
+                setattr(obj, column.key, value)
+            row[column.key] = value
+        return row
+
     def save(self):
         """
         Commit all changes of the current database session
         """
+        info = self.__session.info
+        if info.get('batching'):
+            info['batch_saved'] = True
+            return
         self.__session.commit()
 
     def delete(self, obj=None):
@@ -78,17 +329,47 @@ class DBStorage:
         if obj:
             self.__session.delete(obj)
 
+    @contextmanager
+    def batch(self):
+        """
+        Defer commits until the block exits, then commit once;
+        roll the session back if the block raises. The state lives in
+        the session, so a batch only covers the current thread
+        """
+        info = self.__session.info
+        if info.get('batching'):
+            yield self
+            return
+        info['batching'] = True
+        info['batch_saved'] = False
+        try:
+            yield self
+        except BaseException:
+            self.__session.rollback()
+            raise
+        finally:
+            info['batching'] = False
+        if info['batch_saved']:
+            self.save()
+
+    def touch(self, obj, name, old=None):
+        """
+        Nothing to index: the session tracks attribute changes itself
+        """
+        pass
+
     def reload(self):
         """
-        Create all tables in the database
+        Create all tables in the database and the session registry:
+        every thread, so every request of a threaded server, gets its
+        own session on first use
         """
         Base.metadata.create_all(self.__engine)
-        Session = scoped_session(sessionmaker(bind=self.__engine,
-                                              expire_on_commit=False))
-        self.__session = Session()
+        self.__session = scoped_session(sessionmaker(bind=self.__engine,
+                                                     expire_on_commit=False))
 
     def close(self):
         """
-        Close current session
+        Close and discard the current thread's session
         """
-        self.__session.close()
+        self.__session.remove()
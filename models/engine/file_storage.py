@@ -1,45 +1,154 @@
 #!/usr/bin/python3
 """This module defines a class to manage file storage for hbnb clone"""
+import atexit
 import json
+import os
+import re
+import tempfile
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from itertools import islice
+from os import getenv
+from models.engine.json_codec import get_codec
+from models.engine import snapshot
+from models.engine.attr_index import AttrIndex
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+def _iter_members(f, size=1 << 16):
+    """Yields (key, value, text) for each member of the JSON object in the
+    file f, reading it size characters at a time instead of all at once"""
+    blank = re.compile(r'\s*')
+    decoder = json.JSONDecoder()
+    buf, pos, state, key = '', 0, 'start', None
+    while True:
+        pos = blank.match(buf, pos).end()
+        if pos == len(buf):
+            chunk = f.read(size)
+            if not chunk:
+                raise ValueError("Unterminated JSON object")
+            buf, pos = buf[pos:] + chunk, 0
+            continue
+        char = buf[pos]
+        if state == 'start':
+            if char != '{':
+                raise ValueError("Expected a JSON object")
+            state, pos = 'first', pos + 1
+        elif state in ('first', 'next') and char == '}':
+            return
+        elif state in ('next', 'colon'):
+            if char != (',' if state == 'next' else ':'):
+                raise ValueError("Unexpected {!r} in JSON".format(char))
+            state, pos = 'key' if state == 'next' else 'value', pos + 1
+        else:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                chunk = f.read(size)
+                if not chunk:
+                    raise
+                buf, pos = buf[pos:] + chunk, 0
+                continue
+            if state == 'value':
+                yield key, value, buf[pos:end]
+                state = 'next'
+            else:
+                key, state = value, 'colon'
+            pos = end
 
 
 class FileStorage:
     """This class manages storage of hbnb models in JSON format"""
     __file_path = 'file.json'
+    __snapshot_path = 'file.pickle'
     __objects = {}
+    # key -> obj (None once deleted) changed since the last save, or None
+    # when unknown because __objects was swapped out
+    __pending = {}
+    __journal_count = 0
+    # key -> JSON text of the object as last saved, spliced into file.json
+    # so save() only encodes the objects that changed
+    __fragments = {}
+    # class name -> {key: obj}, mirrors __objects so all(cls) and count(cls)
+    # only touch the objects of that class
+    __by_class = {}
+    __indexed = None
+    __indexed_count = 0
+    # foreign keys that are reverse indexed, so Place.reviews is a
+    # lookup: class name -> attribute, then
+    # class name -> {attribute value: {key: obj}}; State.cities is a
+    # query() served by the AttrIndex of City.state_id instead
+    __relations = {'Review': 'place_id'}
+    __related = {}
+    __related_value = {}
+    # class name -> {attribute: AttrIndex} for the attributes find() was
+    # asked about, built on first use and dropped when __objects is
+    __attr_indexes = {}
+    # class name -> {key: dict} read by a lazy reload and not yet turned
+    # into model instances
+    __raw = {}
+    # per thread, the undo log of its running batch() (None outside of
+    # one) and whether save() was called in it, so a batch only defers
+    # and rolls back the saves and changes of the thread running it
+    __batching = threading.local()
+    # held while objects are added, changed or removed and while they are
+    # written, so the background writer never sees a half-made change
+    __lock = threading.RLock()
+    __writer = None
+    __wake_writer = threading.Event()
+    # set by save() and cleared once flush() has written the changes
+    __dirty = False
+    # what the files looked like when this process last read or wrote them
+    __seen = None
+    __file_locked = 0
 
-    def all(self, cls=None):
-        """Returns a dictionary of models currently in storage"""
-        if cls:
-            instances = {}
-            for key, obj in FileStorage.__objects.items():
-                if isinstance(obj, cls):
-                    instances[key] = obj
-            return instances
+    def __init__(self):
+        """Reads the file format, journal, lazy reload and JSON codec
+        settings from the environment"""
+        self.__binary = getenv("HBNB_FILE_FORMAT") == "pickle"
+        if self.__binary:
+            self.__path = FileStorage.__snapshot_path
         else:
-            return FileStorage.__objects
+            self.__path = FileStorage.__file_path
+        self.__journal_path = self.__path + '.journal'
+        self.__journal = getenv("HBNB_FILE_JOURNAL") == "1"
+        self.__lazy = getenv("HBNB_FILE_LAZY") == "1"
+        self.__codec = get_codec(getenv("HBNB_JSON_CODEC"))
+        self.__journal_max = int(getenv("HBNB_FILE_JOURNAL_MAX", 1000))
+        self.__interval = float(getenv("HBNB_FILE_WRITE_INTERVAL", 0))
+        self.__merge = getenv("HBNB_FILE_MERGE") == "1"
+        self.__shared = getenv("HBNB_FILE_SHARED") == "1" or self.__merge
 
-    def new(self, obj):
-        """Adds new object to storage dictionary"""
-        self.all().update({obj.to_dict()['__class__'] + '.' + obj.id: obj})
+    def __index(self):
+        """Returns the per-class index, rebuilding it when __objects was
+        replaced or changed size without going through new/delete"""
+        objects = FileStorage.__objects
+        if objects is not FileStorage.__indexed or \
+                len(objects) != FileStorage.__indexed_count:
+            if objects is not FileStorage.__indexed:
+                FileStorage.__raw = {}
+            by_class = {}
+            FileStorage.__related = {}
+            FileStorage.__related_value = {}
+            FileStorage.__attr_indexes = {}
+            for key, obj in objects.items():
+                cls_name = key.split('.')[0]
+                by_class.setdefault(cls_name, {})[key] = obj
+                self.__relate(key, obj)
+            FileStorage.__by_class = by_class
+            FileStorage.__indexed = objects
+            FileStorage.__indexed_count = len(objects)
+            FileStorage.__pending = None
+        return FileStorage.__by_class
 
-    def save(self):
-        """Saves storage dictionary to file"""
-        with open(FileStorage.__file_path, 'w') as f:
-            temp = {}
-            temp.update(FileStorage.__objects)
-            for key, value in temp.items():
-                temp[key] = value.to_dict()
-            json.dump(temp, f)
-
-    def delete(self, obj=None):
-        """Delete an object if exists"""
-        if obj:
-            key = f"{type(obj).__name__}.{obj.id}"
-            del self.__objects[key]
-
-    def reload(self):
-        """Loads storage dictionary from file"""
+    def __classes(self):
+        """Returns the model classes by name"""
         from models.base_model import BaseModel
         from models.user import User
         from models.place import Place
@@ -57,11 +166,583 @@ class FileStorage:
             'Amenity': Amenity,
             'Review': Review
             }
+        return classes
+
+    def __add(self, key, obj):
+        """Puts obj in __objects and the indexes under key"""
+        index = self.__index()
+        if key not in FileStorage.__objects:
+            FileStorage.__indexed_count += 1
+        FileStorage.__objects[key] = obj
+        index.setdefault(type(obj).__name__, {})[key] = obj
+        self.__relate(key, obj)
+        for attr_index in FileStorage.__attr_indexes.get(
+                type(obj).__name__, {}).values():
+            attr_index.add(key, obj)
+
+    def __wake(self, cls_name=None, key=None):
+        """Turns raw dicts left by a lazy reload into model instances, for
+        one key, one class or everything"""
+        if not FileStorage.__raw:
+            return
+        with FileStorage.__lock:
+            self.__wake_locked(cls_name, key)
+
+    def __wake_locked(self, cls_name, key):
+        """Does the work of __wake once the lock is held"""
+        raw = FileStorage.__raw
+        if key is not None:
+            value = raw.get(key.split('.')[0], {}).pop(key, None)
+            items = [] if value is None else [(key, value)]
+        elif cls_name is not None:
+            items = raw.pop(cls_name, {}).items()
+        else:
+            items = [item for values in raw.values()
+                     for item in values.items()]
+            FileStorage.__raw = {}
+        classes = self.__classes()
+        for k, value in items:
+            self.__add(k, classes[value['__class__']](**value))
+
+    def __relate(self, key, obj):
+        """Files obj under the current value of its indexed foreign key"""
+        cls_name = type(obj).__name__
+        attr = FileStorage.__relations.get(cls_name)
+        if attr is None:
+            return
+        self.__unrelate(key, cls_name)
+        value = getattr(obj, attr, None)
+        FileStorage.__related_value[key] = value
+        FileStorage.__related.setdefault(cls_name, {}).setdefault(
+            value, {})[key] = obj
+
+    def __unrelate(self, key, cls_name):
+        """Removes key from the foreign key index of its class"""
+        if key in FileStorage.__related_value:
+            value = FileStorage.__related_value.pop(key)
+            bucket = FileStorage.__related[cls_name][value]
+            del bucket[key]
+            if not bucket:
+                del FileStorage.__related[cls_name][value]
+
+    def all(self, cls=None, load=None):
+        """Returns a dictionary of models currently in storage; load
+        names DBStorage eager-loading options and is ignored here"""
+        if cls:
+            if not isinstance(cls, str):
+                cls = cls.__name__
+            self.__wake(cls)
+            return dict(self.__index().get(cls, {}))
+        else:
+            self.__wake()
+            return FileStorage.__objects
+
+    def stream(self, cls=None, chunk=1000, load=None, offset=0,
+               limit=None):
+        """Yields (key, object) pairs of all objects, or of one class,
+        skipping offset of them and stopping after limit; chunk and load
+        only matter to DBStorage"""
+        if cls:
+            if not isinstance(cls, str):
+                cls = cls.__name__
+            self.__wake(cls)
+            objects = self.__index().get(cls, {})
+        else:
+            self.__wake()
+            objects = FileStorage.__objects
+        stop = None if limit is None else offset + limit
+        # a copy of the pairs, so storage can change while they are used
+        return iter(list(objects.items())[offset:stop])
+
+    def count(self, cls=None):
+        """Returns the number of objects in storage, or of one class"""
+        if cls:
+            if not isinstance(cls, str):
+                cls = cls.__name__
+            return len(self.__index().get(cls, {})) + \
+                len(FileStorage.__raw.get(cls, {}))
+        self.__index()
+        return len(FileStorage.__objects) + \
+            sum(len(values) for values in FileStorage.__raw.values())
+
+    def get(self, cls, id, load=None):
+        """Returns the object of class cls with that id, or None; load
+        is ignored as in all()"""
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        key = cls + '.' + str(id)
+        self.__wake(key=key)
+        return FileStorage.__objects.get(key)
+
+    def find(self, cls, filters):
+        """Returns the objects of cls matching every (attribute, operator,
+        value) filter, the operator one of = != < <= > >=, answered from
+        per-attribute indexes built on first use"""
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        self.__wake(cls)
+        with FileStorage.__lock:
+            objects = self.__index().get(cls, {})
+            keys = self.__matching(cls, filters)
+            if keys is None:
+                return dict(objects)
+            return {key: objects[key] for key in sorted(keys)}
+
+    def query(self, cls, where=(), order_by='id', limit=None, after=None,
+              load=None):
+        """Returns the list of cls objects matching where, filters as for
+        find or a dict of attribute: value, in the order of the attribute
+        order_by ('-' in front for descending, ties broken by id), from
+        just past after, the last object of the previous page or its
+        (value, id), and at most limit of them; served from the sorted
+        per-attribute indexes, objects without the attribute last as if
+        it were the largest value, and none at all when no object has
+        it. load only matters to DBStorage"""
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        if isinstance(where, dict):
+            where = [(attr, '=', value) for attr, value in where.items()]
+        reverse = order_by.startswith('-')
+        attr = order_by.lstrip('-')
+        if after is not None:
+            if not isinstance(after, tuple):
+                after = (getattr(after, attr, None), after.id)
+            after = (after[0], "{}.{}".format(cls, after[1]))
+        self.__wake(cls)
+        with FileStorage.__lock:
+            objects = self.__index().get(cls, {})
+            keys = self.__matching(cls, where)
+            if keys is not None and not keys or \
+                    not any(hasattr(obj, attr) for obj in objects.values()):
+                return []
+            ordered = self.__attr_index(cls, attr).ordered(reverse, after,
+                                                           keys)
+            return [objects[key] for key in islice(ordered, limit)]
+
+    def __matching(self, cls_name, filters):
+        """Returns the set of keys of cls_name matching every filter, or
+        None when there are no filters"""
+        keys = None
+        for attr, op, value in filters:
+            found = self.__attr_index(cls_name, attr).find(op, value)
+            keys = found if keys is None else keys & found
+            if not keys:
+                break
+        return keys
+
+    def __attr_index(self, cls_name, attr):
+        """Returns the index of attr for cls_name, building it if needed"""
+        indexes = FileStorage.__attr_indexes.setdefault(cls_name, {})
+        if attr not in indexes:
+            indexes[attr] = AttrIndex.build(
+                attr, self.__index().get(cls_name, {}).items())
+        return indexes[attr]
+
+    def related(self, cls, attr, value):
+        """Returns the list of cls objects whose attr equals value"""
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        self.__wake(cls)
+        index = self.__index()
+        if FileStorage.__relations.get(cls) == attr:
+            return list(FileStorage.__related.get(cls, {}).get(
+                value, {}).values())
+        return [obj for obj in index.get(cls, {}).values()
+                if getattr(obj, attr, None) == value]
+
+    def touch(self, obj, name, old=None):
+        """Keeps the indexes in sync after attribute name of obj changed
+        from old"""
+        cls_name = type(obj).__name__
+        key = cls_name + '.' + str(obj.__dict__.get('id'))
+        if FileStorage.__objects.get(key) is not obj:
+            return
+        with FileStorage.__lock:
+            self.__index()
+            undo = self.__undo()
+            if undo is not None:
+                undo.append((obj, name, old))
+            if FileStorage.__pending is not None:
+                FileStorage.__pending[key] = obj
+            if FileStorage.__relations.get(cls_name) == name:
+                self.__relate(key, obj)
+            attr_index = FileStorage.__attr_indexes.get(
+                cls_name, {}).get(name)
+            if attr_index is not None:
+                attr_index.add(key, obj)
+
+    def new(self, obj):
+        """Adds new object to storage dictionary"""
+        key = type(obj).__name__ + '.' + obj.id
+        self.__wake(key=key)
+        with FileStorage.__lock:
+            undo = self.__undo()
+            if undo is not None:
+                undo.append(
+                    (key, FileStorage.__objects.get(key)))
+            self.__add(key, obj)
+            if FileStorage.__pending is not None:
+                FileStorage.__pending[key] = obj
+
+    def new_many(self, objs):
+        """Adds many objects under one lock hold; returns their number"""
+        count = 0
+        undo = self.__undo()
+        with FileStorage.__lock:
+            for obj in objs:
+                key = type(obj).__name__ + '.' + obj.id
+                self.__wake(key=key)
+                if undo is not None:
+                    undo.append(
+                        (key, FileStorage.__objects.get(key)))
+                self.__add(key, obj)
+                if FileStorage.__pending is not None:
+                    FileStorage.__pending[key] = obj
+                count += 1
+        return count
+
+    def save(self):
+        """Saves storage dictionary to file; with a write interval set the
+        background writer does it instead"""
+        if self.__undo() is not None:
+            FileStorage.__batching.saved = True
+            return
+        if self.__interval > 0:
+            with FileStorage.__lock:
+                FileStorage.__dirty = True
+            self.__schedule()
+        else:
+            self.flush()
+
+    def flush(self):
+        """Writes the changes since the last save now: the whole file, or
+        in journal mode only the changed objects appended to the journal"""
+        with FileStorage.__lock, self.__file_lock():
+            if self.__merge and self.__signature() != FileStorage.__seen:
+                self.__resync()
+            self.__index()
+            pending = FileStorage.__pending
+            if self.__journal and pending is not None and \
+                    FileStorage.__journal_count + len(pending) <= \
+                    self.__journal_max:
+                self.__append_journal(pending)
+            else:
+                self.__write_snapshot(pending)
+            FileStorage.__pending = {}
+            FileStorage.__seen = self.__signature()
+            FileStorage.__dirty = False
+
+    @contextmanager
+    def __file_lock(self, shared=False):
+        """Holds the advisory lock other processes sharing the file take
+        too, when HBNB_FILE_SHARED is set"""
+        if not self.__shared or fcntl is None or FileStorage.__file_locked:
+            yield
+            return
+        with open(self.__path + '.lock', 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            FileStorage.__file_locked += 1
+            try:
+                yield
+            finally:
+                FileStorage.__file_locked -= 1
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def __signature(self):
+        """Returns the inode, size and mtime of the file and journal"""
+        signature = []
+        for path in (self.__path, self.__journal_path):
+            try:
+                st = os.stat(path)
+                signature.append((st.st_ino, st.st_size, st.st_mtime_ns))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def refresh(self):
+        """Reloads the objects if another process changed the file since
+        this one last read or wrote it; unsaved changes are kept"""
+        if self.__undo() is not None or \
+                self.__signature() == FileStorage.__seen:
+            return False
+        with FileStorage.__lock, self.__file_lock(shared=True):
+            self.__resync()
+        return True
+
+    def close(self):
+        """Picks up changes other processes saved, e.g. between requests"""
+        self.refresh()
+
+    def __resync(self):
+        """Reads the file again and puts the unsaved changes of this
+        process back on top"""
+        pending = FileStorage.__pending
+        if pending is None:
+            pending = dict(FileStorage.__objects)
+        FileStorage.__objects.clear()
+        FileStorage.__raw = {}
+        self.__load()
+        for key, obj in pending.items():
+            if obj is not None:
+                self.new(obj)
+            else:
+                self.delete(self.get(*key.split('.', 1)))
+
+    def __schedule(self):
+        """Wakes the writer thread, starting it on first use"""
+        with FileStorage.__lock:
+            if FileStorage.__writer is None:
+                FileStorage.__writer = threading.Thread(
+                    target=self.__write_loop, daemon=True)
+                FileStorage.__writer.start()
+                atexit.register(self.__write_at_exit)
+        FileStorage.__wake_writer.set()
+
+    def __write_loop(self):
+        """Turns the save() calls made during each interval into one
+        write"""
+        while True:
+            FileStorage.__wake_writer.wait()
+            FileStorage.__wake_writer.clear()
+            try:
+                self.flush()
+            except Exception:
+                traceback.print_exc()
+            time.sleep(self.__interval)
+
+    def __write_at_exit(self):
+        """Writes the saves the writer thread did not get to yet, once a
+        write it is in the middle of has finished"""
+        with FileStorage.__lock:
+            if FileStorage.__dirty:
+                self.flush()
+
+    def __replace(self, path, write):
+        """Calls write with a temporary file next to path, syncs it to disk
+        and renames it over path, so a crash or a reader in another process
+        sees either the old file or the new one, never part of it"""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp = tempfile.mkstemp(dir=directory, suffix='.tmp',
+                                    prefix='.' + os.path.basename(path))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+                f.flush()
+                os.fsync(f.fileno())
+            if os.path.exists(path):
+                os.chmod(temp, os.stat(path).st_mode & 0o777)
+            else:
+                os.chmod(temp, 0o644)
+            os.replace(temp, path)
+        except BaseException:
+            os.remove(temp)
+            raise
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def __record(self, obj):
+        """Returns obj.to_dict() but with the datetimes left for the codec
+        to encode"""
+        record = dict(obj.__dict__)
+        record['__class__'] = type(obj).__name__
+        record.pop('_sa_instance_state', None)
+        return record
+
+    def __fragment(self, key, obj):
+        """Returns the cached JSON text of obj, encoding it if needed"""
+        fragment = FileStorage.__fragments.get(key)
+        if fragment is None:
+            fragment = self.__codec.dumps(self.__record(obj))
+            FileStorage.__fragments[key] = fragment
+        return fragment
+
+    def __write_snapshot(self, pending):
+        """Rewrites the whole file and drops the folded-in journal"""
+        if self.__binary:
+            records = [self.__record(obj)
+                       for obj in FileStorage.__objects.values()]
+            for values in FileStorage.__raw.values():
+                records.extend(values.values())
+            self.__replace(self.__path,
+                           lambda f: snapshot.dump(records, f))
+        else:
+            self.__write_json(pending)
+        if os.path.exists(self.__journal_path):
+            os.remove(self.__journal_path)
+        FileStorage.__journal_count = 0
+
+    def __write_json(self, pending):
+        """Writes file.json, only encoding the objects changed since the
+        last save"""
+        if pending is None:
+            FileStorage.__fragments = {}
+        else:
+            for key in pending:
+                FileStorage.__fragments.pop(key, None)
+        dumps = self.__codec.dumps
+        parts = [dumps(key) + ':' + self.__fragment(key, obj)
+                 for key, obj in FileStorage.__objects.items()]
+        for values in FileStorage.__raw.values():
+            for key, value in values.items():
+                fragment = FileStorage.__fragments.get(key)
+                if fragment is None:
+                    fragment = dumps(value)
+                parts.append(dumps(key) + ':' + fragment)
+        text = '{' + ','.join(parts) + '}'
+        self.__replace(self.__path, lambda f: f.write(text.encode('utf-8')))
+
+    def __append_journal(self, pending):
+        """Appends one line per changed key, null marking a deletion"""
+        if not pending:
+            return
+        with open(self.__journal_path, 'a', encoding='utf-8') as f:
+            for key, obj in pending.items():
+                FileStorage.__fragments.pop(key, None)
+                if obj is not None:
+                    value = self.__fragment(key, obj)
+                else:
+                    value = 'null'
+                f.write('{' + self.__codec.dumps(key) + ':' + value + '}\n')
+            f.flush()
+            os.fsync(f.fileno())
+        FileStorage.__journal_count += len(pending)
+
+    def delete(self, obj=None):
+        """Delete an object if exists"""
+        if obj:
+            cls_name = type(obj).__name__
+            key = f"{cls_name}.{obj.id}"
+            with FileStorage.__lock:
+                index = self.__index()
+                removed = FileStorage.__objects.pop(key, None)
+                if removed is None:
+                    return
+                undo = self.__undo()
+                if undo is not None:
+                    undo.append((key, removed))
+                FileStorage.__indexed_count -= 1
+                index[cls_name].pop(key, None)
+                self.__unrelate(key, cls_name)
+                for attr_index in FileStorage.__attr_indexes.get(
+                        cls_name, {}).values():
+                    attr_index.discard(key)
+                if FileStorage.__pending is not None:
+                    FileStorage.__pending[key] = None
+
+    @contextmanager
+    def batch(self):
+        """Defers save() in this thread until the block exits and then
+        saves once; if the block raises, the objects this thread changed
+        are put back the way they were"""
+        batching = FileStorage.__batching
+        if self.__undo() is not None:
+            yield self
+            return
+        batching.undo = []
+        batching.saved = False
+        try:
+            yield self
+        except BaseException:
+            self.__rollback()
+            raise
+        finally:
+            batching.undo = None
+        if batching.saved:
+            self.save()
+
+    def __undo(self):
+        """Returns the undo log of the batch this thread is running, or
+        None outside of one"""
+        return getattr(FileStorage.__batching, 'undo', None)
+
+    def __rollback(self):
+        """Replays the undo log of the running batch backwards"""
+        from models.base_model import UNSET
+
+        with FileStorage.__lock:
+            for entry in reversed(self.__undo()):
+                if len(entry) == 2:
+                    key, obj = entry
+                    if obj is None:
+                        FileStorage.__objects.pop(key, None)
+                    else:
+                        FileStorage.__objects[key] = obj
+                else:
+                    obj, name, old = entry
+                    if old is UNSET:
+                        obj.__dict__.pop(name, None)
+                    else:
+                        obj.__dict__[name] = old
+            # indexes and the change set are rebuilt from scratch
+            FileStorage.__indexed_count = -1
+
+    def __read_snapshot(self):
+        """Yields (key, dict, JSON text or None) for each object saved in
+        the snapshot file"""
+        if self.__binary:
+            with open(self.__path, 'rb') as f:
+                for key, value in snapshot.load(f):
+                    yield key, value, None
+        elif self.__lazy:
+            with open(self.__path, 'r', encoding='utf-8') as f:
+                yield from _iter_members(f)
+        else:
+            with open(self.__path, 'r', encoding='utf-8') as f:
+                data = self.__codec.loads(f.read())
+            for key, value in data.items():
+                yield key, value, None
+
+    def reload(self):
+        """Loads storage dictionary from file, then replays the journal;
+        a lazy reload only keeps the parsed dicts until they are used"""
+        with FileStorage.__lock, self.__file_lock(shared=True):
+            self.__load()
+
+    def __load(self):
+        """Does the work of reload once the locks are held"""
+        classes = self.__classes()
+        self.__index()
+        if FileStorage.__pending is None:
+            FileStorage.__fragments = {}
+            FileStorage.__pending = {}
+        try:
+            for key, value, text in self.__read_snapshot():
+                # keys already built are replaced as in an eager reload,
+                # so they are not counted and written twice
+                if self.__lazy and key not in FileStorage.__objects:
+                    FileStorage.__raw.setdefault(
+                        key.split('.')[0], {})[key] = value
+                    if text is not None:
+                        FileStorage.__fragments[key] = text
+                else:
+                    self.new(classes[value['__class__']](**value))
+        except FileNotFoundError:
+            pass
+        FileStorage.__journal_count = 0
         try:
-            data = {}
-            with open(FileStorage.__file_path, 'r') as f:
-                data = json.load(f)
-                for key, value in data.items():
-                    self.all()[key] = classes[value['__class__']](**value)
+            with open(self.__journal_path, 'r',
+                      encoding='utf-8') as f:
+                for line in f:
+                    if not line.endswith('\n'):
+                        # torn by a crash in the middle of an append
+                        break
+                    for key, value in self.__codec.loads(line).items():
+                        if value is not None:
+                            self.new(classes[value['__class__']](**value))
+                        else:
+                            self.delete(self.get(*key.split('.', 1)))
+                    FileStorage.__journal_count += 1
         except FileNotFoundError:
             pass
+        for key in FileStorage.__pending or ():
+            FileStorage.__fragments.pop(key, None)
+        FileStorage.__pending = {}
+        FileStorage.__seen = self.__signature()
@@ -0,0 +1,88 @@
+#!/usr/bin/python3
+"""JSON codecs for FileStorage: orjson or ujson when they are installed,
+the standard json module otherwise. Every codec writes the same compact
+UTF-8 text, so file.json does not depend on the codec that wrote it."""
+import json
+from datetime import datetime
+
+
+def _default(value):
+    """Encodes the values the standard json module does not know"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError("{} is not JSON serializable".format(type(value)))
+
+
+class JsonCodec:
+    """Codec backed by the standard json module"""
+    name = 'json'
+
+    def dumps(self, value):
+        """Returns value as JSON text"""
+        return json.dumps(value, separators=(',', ':'), ensure_ascii=False,
+                          default=_default)
+
+    def loads(self, text):
+        """Returns the value of JSON text"""
+        return json.loads(text)
+
+
+class UjsonCodec(JsonCodec):
+    """Codec backed by ujson"""
+    name = 'ujson'
+
+    def __init__(self):
+        """Imports ujson, raising ImportError when it is missing"""
+        import ujson
+        self.__ujson = ujson
+
+    def dumps(self, value):
+        """Returns value as JSON text"""
+        return self.__ujson.dumps(value, ensure_ascii=False,
+                                  escape_forward_slashes=False,
+                                  default=_default)
+
+    def loads(self, text):
+        """Returns the value of JSON text"""
+        return self.__ujson.loads(text)
+
+
+class OrjsonCodec(JsonCodec):
+    """Codec backed by orjson, which encodes datetimes itself"""
+    name = 'orjson'
+
+    def __init__(self):
+        """Imports orjson, raising ImportError when it is missing"""
+        import orjson
+        self.__orjson = orjson
+
+    def dumps(self, value):
+        """Returns value as JSON text"""
+        return self.__orjson.dumps(value, default=_default).decode('utf-8')
+
+    def loads(self, text):
+        """Returns the value of JSON text"""
+        return self.__orjson.loads(text)
+
+
+codecs = {
+    'orjson': OrjsonCodec,
+    'ujson': UjsonCodec,
+    'json': JsonCodec
+    }
+
+
+def get_codec(name=None):
+    """Returns the codec called name, or without a name the fastest one
+    installed; a codec that is not installed falls back to the next"""
+    if name and name not in codecs:
+        raise ValueError("Unknown JSON codec: {}".format(name))
+    order = list(codecs)
+    if name:
+        order = order[order.index(name):]
+    for codec in order:
+        try:
+            return codecs[codec]()
+        except ImportError:
+            pass
+    return JsonCodec()
@@ -0,0 +1,76 @@
+#!/usr/bin/python3
+"""Binary snapshot format for FileStorage: a pickle (protocol 5) with,
+for each class, its objects as rows of values under a shared tuple of
+column names, so attribute names and __class__ are stored once per class
+instead of once per object, and datetimes are kept as datetimes.
+
+Convert a file between the JSON and binary formats with
+convert_storage.py.
+"""
+import pickle
+from models.base_model import parse_time
+from models.engine.json_codec import get_codec
+
+VERSION = 1
+MAGIC = b'\x80\x05'
+
+
+def dump(records, f):
+    """Writes the records (dicts as returned by to_dict) to the binary
+    file f"""
+    classes = {}
+    for record in records:
+        columns = tuple(name for name in record if name != '__class__')
+        groups = classes.setdefault(record['__class__'], {})
+        groups.setdefault(columns, []).append(
+            tuple(record[name] for name in columns))
+    data = {'version': VERSION,
+            'classes': {cls_name: list(groups.items())
+                        for cls_name, groups in classes.items()}}
+    pickle.dump(data, f, protocol=5)
+
+
+def load(f):
+    """Yields (key, record) for each object in the binary file f"""
+    try:
+        data = pickle.load(f)
+    except EOFError:
+        raise ValueError("Empty snapshot file")
+    if not isinstance(data, dict) or data.get('version') != VERSION:
+        raise ValueError("Unknown snapshot version")
+    for cls_name, groups in data['classes'].items():
+        for columns, rows in groups:
+            id_at = columns.index('id')
+            for row in rows:
+                record = dict(zip(columns, row))
+                record['__class__'] = cls_name
+                yield cls_name + '.' + row[id_at], record
+
+
+def is_snapshot(path):
+    """Tells whether the file at path is in the binary format"""
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def convert(source, target):
+    """Copies the objects of source into target, writing the binary
+    format unless target ends with .json"""
+    codec = get_codec()
+    if is_snapshot(source):
+        with open(source, 'rb') as f:
+            records = dict(load(f))
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            records = codec.loads(f.read())
+    for record in records.values():
+        for name in ('created_at', 'updated_at'):
+            if name in record:
+                record[name] = parse_time(record[name])
+    if target.endswith('.json'):
+        with open(target, 'w', encoding='utf-8') as f:
+            f.write(codec.dumps(records))
+    else:
+        with open(target, 'wb') as f:
+            dump(records.values(), f)
+    return len(records)
@@ -1,6 +1,7 @@
 #!/usr/bin/python3
 """ Place Module for HBNB project """
 from sqlalchemy import Column, String, Integer, Float, ForeignKey, Table
+from sqlalchemy import Index
 from sqlalchemy.orm import relationship
 from models.base_model import BaseModel, Base
 from os import getenv
@@ -12,15 +13,20 @@ import models
 class Place(BaseModel, Base):
     """ A place to stay """
     __tablename__ = 'places'
+    # a city's places, already in price order
+    __table_args__ = (Index('ix_places_city_id_price_by_night',
+                            'city_id', 'price_by_night'),)
 
     city_id = Column(String(60), ForeignKey('cities.id'), nullable=False)
-    user_id = Column(String(60), ForeignKey('users.id'), nullable=False)
+    user_id = Column(String(60), ForeignKey('users.id'), nullable=False,
+                     index=True)
     name = Column(String(128), nullable=False)
     description = Column(String(1024), nullable=True)
     number_rooms = Column(Integer, nullable=False, default=0)
     number_bathrooms = Column(Integer, nullable=False, default=0)
     max_guest = Column(Integer, nullable=False, default=0)
-    price_by_night = Column(Integer, nullable=False, default=0)
+    price_by_night = Column(Integer, nullable=False, default=0,
+                            index=True)
     latitude = Column(Float, nullable=True)
     longitude = Column(Float, nullable=True)
     reviews = relationship("Review", backref="place", cascade="delete")
@@ -34,7 +40,8 @@ class Place(BaseModel, Base):
                                  primary_key=True, nullable=False),
                           Column('amenity_id', String(60),
                                  ForeignKey('amenities.id'),
-                                 primary_key=True, nullable=False))
+                                 primary_key=True, nullable=False,
+                                 index=True))
 
     amenity_ids = []
 
@@ -42,18 +49,15 @@ class Place(BaseModel, Base):
         @property
         def reviews(self):
             """get a list of linked reviews"""
-            review_list = []
-            for review in list(models.storage.all(Review).values()):
-                if review.place_id == self.id:
-                    review_list.append(review)
-            return review_list
+            return models.storage.related(Review, 'place_id', self.id)
 
         @property
         def amenities(self):
             """get amenities"""
             amenity_list = []
-            for amenity in list(models.storage.all(Amenity).values()):
-                if amenity.id in self.amenity_ids:
+            for amenity_id in self.amenity_ids:
+                amenity = models.storage.get(Amenity, amenity_id)
+                if amenity is not None:
                     amenity_list.append(amenity)
             return amenity_list
 
@@ -61,5 +65,6 @@ class Place(BaseModel, Base):
         def amenities(self, obj):
             """Setter attribute amenities"""
             from models.amenity import Amenity
-            if isinstance(obj, Amenity):
-                self.amenity_ids.append(obj.id)
+            if isinstance(obj, Amenity) and obj.id not in self.amenity_ids:
+                # assign a new list: amenity_ids is shared at class level
+                self.amenity_ids = self.amenity_ids + [obj.id]
@@ -8,8 +8,10 @@ class Review(BaseModel, Base):
     """ Review class to store review information """
     __tablename__ = 'reviews'
 
-    place_id = Column(String(60), ForeignKey('places.id'), nullable=False)
-    user_id = Column(String(60), ForeignKey('users.id'), nullable=False)
+    place_id = Column(String(60), ForeignKey('places.id'), nullable=False,
+                      index=True)
+    user_id = Column(String(60), ForeignKey('users.id'), nullable=False,
+                     index=True)
     text = Column(String(1024), nullable=False)
 
     def __init__(self, *args, **kwargs):
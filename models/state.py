@@ -2,7 +2,7 @@
 """ State Module for HBNB project """
 from models.base_model import BaseModel, Base
 from sqlalchemy.orm import relationship
-from sqlalchemy import Column, String
+from sqlalchemy import Column, String, func
 from models.city import City
 from os import getenv
 
@@ -10,23 +10,23 @@ from os import getenv
 class State(BaseModel, Base):
     """ State class """
     __tablename__ = "states"
-    name = Column(String(128), nullable=False)
+    name = Column(String(128), nullable=False, index=True)
 
     cities = relationship("City", backref="state",
-                          cascade="all, delete-orphan")
+                          cascade="all, delete-orphan",
+                          order_by=[func.lower(City.name), City.id])
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         # self.save()
 
-    @property
-    def cities(self):
-        """
-        Getter for cities related to a state using a FIlEStorage engine
-        """
-        from models import storage
-        st_cities = []
-        for city in storage.all(City).values():
-            if (self.id == city.state_id):
-                st_cities.append(city)
-        return st_cities
+    if getenv("HBNB_TYPE_STORAGE") != "db":
+        @property
+        def cities(self):
+            """
+            Getter for cities related to a state using a FIlEStorage engine,
+            by name as in DB mode
+            """
+            from models import storage
+            return storage.query(City, where={'state_id': self.id},
+                                 order_by='name')
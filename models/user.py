@@ -14,7 +14,7 @@ class User(BaseModel, Base):
 
     __tablename__ = 'users'
 
-    email = Column(String(128), nullable=False)
+    email = Column(String(128), nullable=False, index=True)
     password = Column(String(128), nullable=False)
     first_name = Column(String(128), nullable=True)
     last_name = Column(String(128), nullable=True)
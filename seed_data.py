@@ -0,0 +1,95 @@
+#!/usr/bin/python3
+""" Generates a synthetic HBNB dataset in JSON Lines, one to_dict()
+record per line, for the console's load command
+
+Usage: ./seed_data.py <file.jsonl> [scale] [seed]
+"""
+import json
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+# objects per unit of scale, and average children per parent
+STATES = 50
+USERS = 1000
+AMENITIES = 20
+CITIES_PER_STATE = 10
+PLACES_PER_CITY = 4
+REVIEWS_PER_PLACE = 5
+AMENITIES_PER_PLACE = 3
+
+
+def generate(scale=1, seed=0):
+    """Yields the records of users, amenities, states, cities, places
+    and reviews, parents before children; the same scale and seed give
+    the same records"""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    serial = [0]
+
+    def record(cls_name, **attributes):
+        """Returns a record with a fresh id and timestamp"""
+        serial[0] += 1
+        stamp = (start + timedelta(seconds=serial[0])).isoformat()
+        attributes.update({
+            'id': str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            'created_at': stamp, 'updated_at': stamp,
+            '__class__': cls_name})
+        return attributes
+
+    def fan_out(mean):
+        """Returns a child count around mean, some parents much busier"""
+        return int(rng.expovariate(1 / mean))
+
+    users = []
+    for i in range(USERS * scale):
+        user = record('User', email="user{}@hbnb.io".format(i),
+                      password="pwd{}".format(i),
+                      first_name="First{}".format(i),
+                      last_name="Last{}".format(i))
+        users.append(user['id'])
+        yield user
+    amenities = []
+    for i in range(AMENITIES):
+        amenity = record('Amenity', name="Amenity{}".format(i))
+        amenities.append(amenity['id'])
+        yield amenity
+    for i in range(STATES * scale):
+        state = record('State', name="State{}".format(i))
+        yield state
+        for j in range(fan_out(CITIES_PER_STATE) + 1):
+            city = record('City', state_id=state['id'],
+                          name="City{}-{}".format(i, j))
+            yield city
+            for k in range(fan_out(PLACES_PER_CITY)):
+                place = record(
+                    'Place', city_id=city['id'], user_id=rng.choice(users),
+                    name="Place{}-{}-{}".format(i, j, k),
+                    description="A place to stay",
+                    number_rooms=rng.randint(1, 6),
+                    number_bathrooms=rng.randint(1, 3),
+                    max_guest=rng.randint(1, 10),
+                    price_by_night=rng.randint(20, 500),
+                    latitude=rng.uniform(-90, 90),
+                    longitude=rng.uniform(-180, 180),
+                    amenity_ids=rng.sample(
+                        amenities, min(AMENITIES_PER_PLACE, AMENITIES)))
+                yield place
+                for n in range(fan_out(REVIEWS_PER_PLACE)):
+                    yield record('Review', place_id=place['id'],
+                                 user_id=rng.choice(users),
+                                 text="Review {}".format(n))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3, 4):
+        print("Usage: {} <file.jsonl> [scale] [seed]".format(sys.argv[0]))
+        sys.exit(1)
+    scale = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    count = 0
+    with open(sys.argv[1], 'w', encoding='utf-8') as f:
+        for count, item in enumerate(generate(scale, seed), 1):
+            f.write(json.dumps(item) + '\n')
+    print("{} objects written to {}".format(count, sys.argv[1]))
@@ -4,3 +4,4 @@ export HBNB_MYSQL_PWD='hbnb_test_pwd'
 export HBNB_MYSQL_HOST='localhost'
 export HBNB_MYSQL_DB='hbnb_test_db'
 export HBNB_TYPE_STORAGE='db'  # or 'file' to test with FileStorage
+# export HBNB_DB_URL='sqlite:////tmp/hbnb_test.db'  # SQLite, no server
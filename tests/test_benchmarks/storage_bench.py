@@ -0,0 +1,99 @@
+#!/usr/bin/python3
+"""Times one storage engine, the one HBNB_TYPE_STORAGE selects, on a
+seed_data dataset and prints the seconds per operation as JSON.
+test_storage.py runs it once per engine, each in a fresh process in an
+empty directory, since the models pick their relationships at import.
+
+Usage: python3 -m tests.test_benchmarks.storage_bench [scale]
+"""
+import importlib
+import io
+import json
+import sys
+from contextlib import redirect_stdout
+from time import perf_counter
+
+
+def timed(results, name, function, runs=1):
+    """Stores the mean seconds of runs calls of function under name"""
+    start = perf_counter()
+    for i in range(runs):
+        function()
+    results[name] = (perf_counter() - start) / runs
+
+
+def traverse(cls, attr, load=None):
+    """Returns a function visiting attr of every cls object, from a
+    fresh session in DB mode so relationships are really loaded"""
+    from models import storage
+
+    def visit():
+        storage.close()
+        for obj in storage.all(cls, load=load).values():
+            len(getattr(obj, attr))
+    return visit
+
+
+def main(scale=1):
+    """Seeds storage and returns the seconds of each operation"""
+    from models import storage
+    from models.state import State
+    from models.place import Place
+    from models.review import Review
+    from console import HBNBCommand
+    from seed_data import generate
+
+    classes = HBNBCommand.classes
+    objs = [classes[record['__class__']](**record)
+            for record in generate(scale)]
+    state = next(obj for obj in objs if type(obj) is State)
+    place = next(obj for obj in objs if type(obj) is Place)
+    results = {}
+
+    def load():
+        storage.new_many(objs)
+        storage.save()
+    timed(results, 'load', load)
+
+    def reload():
+        storage.close()
+        storage.reload()
+        storage.all()
+    timed(results, 'reload', reload, 3)
+
+    def save():
+        obj = storage.get(State, state.id)
+        obj.name = obj.name + "!"
+        storage.save()
+    timed(results, 'save one change', save, 10)
+    for cls in (State, Place, Review):
+        timed(results, 'all({})'.format(cls.__name__),
+              lambda: storage.all(cls), 5)
+    timed(results, 'count(Review)', lambda: storage.count(Review), 5)
+    timed(results, 'get(Place)', lambda: storage.get(Place, place.id), 100)
+    timed(results, 'query(Place) page by price',
+          lambda: storage.query(Place, order_by='price_by_night', limit=50,
+                                after=place), 10)
+    timed(results, 'state cities', traverse(State, 'cities'), 3)
+    timed(results, 'state cities, eager',
+          traverse(State, 'cities', 'cities'), 3)
+    timed(results, 'place reviews', traverse(Place, 'reviews'), 3)
+
+    console = HBNBCommand()
+    for line in ('count Place', 'show Place ' + place.id, 'all State'):
+        with redirect_stdout(io.StringIO()):
+            name = "console '{}'".format(' '.join(line.split(' ')[:2]))
+            timed(results, name, lambda: console.onecmd(line), 10)
+
+    for module, route in (('8-cities_by_states', '/cities_by_states'),
+                          ('10-hbnb_filters', '/hbnb_filters')):
+        app = importlib.import_module('web_flask.' + module).app
+        client = app.test_client()
+        timed(results, 'GET ' + route, lambda: client.get(route), 3)
+    results['objects'] = len(objs)
+    return results
+
+
+if __name__ == "__main__":
+    scale = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    print(json.dumps(main(scale)))
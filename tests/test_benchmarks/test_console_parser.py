@@ -0,0 +1,107 @@
+#!/usr/bin/python3
+"""Benchmarks the console's command parsing in lines per second, alone
+and on a scripted workload of creates and updates.
+Run with HBNB_BENCH=1 python3 -m unittest tests/test_benchmarks/...
+"""
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from time import perf_counter
+from unittest.mock import patch
+from console import HBNBCommand
+from models import storage
+
+LINES = 50000
+
+
+def old_parse(line):
+    """The find/partition/eval parsing precmd and do_update did before
+    the compiled grammar, returning the update arguments"""
+    _cls = line[:line.find('.')]
+    _cmd = line[line.find('.') + 1:line.find('(')]
+    pline = line[line.find('(') + 1:line.find(')')].partition(', ')
+    _id = pline[0].replace('\"', '')
+    pline = pline[2].strip()
+    if pline[0] == '{' and pline[-1] == '}' and type(eval(pline)) is dict:
+        _args = pline
+    else:
+        _args = pline.replace(',', '')
+    args = ' '.join([_cmd, _cls, _id, _args]).partition(' ')[2]
+    args = args.partition(' ')[2].partition(' ')
+    if '{' in args[2] and '}' in args[2] and type(eval(args[2])) is dict:
+        return eval(args[2])
+    return args[2].split(' ')
+
+
+def workload(ids):
+    """Returns LINES update lines in the plain and dot syntaxes"""
+    lines = []
+    for i in range(LINES):
+        place_id = ids[i % len(ids)]
+        kind = i % 3
+        if kind == 0:
+            lines.append('update Place {} name "Place {}"'.format(
+                place_id, i))
+        elif kind == 1:
+            lines.append('Place.update("{}", "max_guest", "{}")'.format(
+                place_id, i % 10))
+        else:
+            lines.append('Place.update("{}", {{"number_rooms": {}, '
+                         '"description": "Room {}"}})'.format(
+                             place_id, i % 5, i))
+    return lines
+
+
+@unittest.skipIf(os.getenv("HBNB_BENCH") != "1", "Set HBNB_BENCH=1")
+class TestConsoleParserBenchmark(unittest.TestCase):
+    """Times parsing and a scripted workload"""
+
+    def setUp(self):
+        """Creates the places the workload updates"""
+        self.console = HBNBCommand()
+        with redirect_stdout(io.StringIO()) as out, \
+                patch.object(storage, 'save'):
+            for i in range(100):
+                self.console.onecmd('create Place name="P{}"'.format(i))
+        self.ids = out.getvalue().split()
+        self.lines = workload(self.ids)
+
+    def test_parse_rate(self):
+        """The compiled grammar parses faster than find/partition/eval"""
+        dot_lines = [line for line in self.lines if '(' in line]
+        start = perf_counter()
+        for line in dot_lines:
+            old_parse(line)
+        old = len(dot_lines) / (perf_counter() - start)
+        start = perf_counter()
+        for line in dot_lines:
+            self.console.arguments(
+                self.console.precmd(line).partition(' ')[2])
+        new = len(dot_lines) / (perf_counter() - start)
+        print("\nparse: {:.0f} lines/s before, {:.0f} lines/s now".format(
+            old, new))
+        self.assertGreater(new, old)
+
+    def test_script_rate(self):
+        """A scripted workload runs without failures"""
+        fd, path = tempfile.mkstemp(suffix='.hbnb')
+        with os.fdopen(fd, 'w') as f:
+            f.write('\n'.join(self.lines) + '\n')
+        try:
+            with redirect_stdout(io.StringIO()), \
+                    patch('sys.stderr', new=io.StringIO()) as err, \
+                    patch.object(storage, 'flush'):
+                start = perf_counter()
+                status = self.console.run_script(path)
+                elapsed = perf_counter() - start
+        finally:
+            os.remove(path)
+        print("\nscript: {} lines in {:.3f}s, {:.0f} lines/s".format(
+            LINES, elapsed, LINES / elapsed))
+        self.assertEqual(status, 0, err.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
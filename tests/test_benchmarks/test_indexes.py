@@ -0,0 +1,130 @@
+#!/usr/bin/python3
+"""Benchmarks the lookup indexes of the models on a seeded SQLite
+database, timing each query with the indexes and after dropping them.
+Run with HBNB_BENCH=1 python3 -m unittest tests/test_benchmarks/...
+"""
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from time import perf_counter
+from sqlalchemy import text
+from models.base_model import Base
+from models.engine.db_storage import DBStorage
+
+STATES = 50
+CITIES = 20
+USERS = 2000
+PLACES = 50000
+REVIEWS = 100000
+RUNS = 200
+
+QUERIES = {
+    'city places by price': (
+        "SELECT id FROM places WHERE city_id = :value "
+        "ORDER BY price_by_night", 'city'),
+    'places in price range': (
+        "SELECT id FROM places WHERE price_by_night BETWEEN :value "
+        "AND :value + 2", 'price'),
+    'place reviews': (
+        "SELECT id FROM reviews WHERE place_id = :value", 'place'),
+    'user by email': (
+        "SELECT id FROM users WHERE email = :value", 'user'),
+    'state cities by name': (
+        "SELECT id FROM cities WHERE state_id = :value ORDER BY name",
+        'state')
+}
+
+
+def values(kind, i):
+    """Returns the i-th parameter of a kind of query"""
+    if kind == 'city':
+        return "city-{}".format(i % (STATES * CITIES))
+    if kind == 'price':
+        return i % 500
+    if kind == 'place':
+        return "place-{}".format(i * 97 % PLACES)
+    if kind == 'user':
+        return "user{}@hbnb.io".format(i * 7 % USERS)
+    return "state-{}".format(i % STATES)
+
+
+@unittest.skipIf(os.getenv("HBNB_BENCH") != "1", "Set HBNB_BENCH=1")
+class TestIndexBenchmark(unittest.TestCase):
+    """Times the hot lookups with and without their indexes"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Seeds a temporary SQLite database"""
+        fd, cls.path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        storage = DBStorage("sqlite:///" + cls.path)
+        storage.reload()
+        cls.engine = storage._DBStorage__engine
+        now = datetime(2024, 1, 1)
+        stamps = {'created_at': now, 'updated_at': now}
+        tables = Base.metadata.tables
+        with cls.engine.begin() as conn:
+            conn.execute(tables['states'].insert(), [
+                dict(stamps, id="state-{}".format(i), name="S{}".format(i))
+                for i in range(STATES)])
+            conn.execute(tables['cities'].insert(), [
+                dict(stamps, id="city-{}".format(i),
+                     state_id="state-{}".format(i % STATES),
+                     name="C{}".format(i * 31 % 997))
+                for i in range(STATES * CITIES)])
+            conn.execute(tables['users'].insert(), [
+                dict(stamps, id="user-{}".format(i), password="pwd",
+                     email="user{}@hbnb.io".format(i))
+                for i in range(USERS)])
+            conn.execute(tables['places'].insert(), [
+                dict(stamps, id="place-{}".format(i), name="P",
+                     city_id="city-{}".format(i % (STATES * CITIES)),
+                     user_id="user-{}".format(i % USERS),
+                     price_by_night=i * 13 % 500, number_rooms=1,
+                     number_bathrooms=1, max_guest=2)
+                for i in range(PLACES)])
+            conn.execute(tables['reviews'].insert(), [
+                dict(stamps, id="review-{}".format(i), text="ok",
+                     place_id="place-{}".format(i % PLACES),
+                     user_id="user-{}".format(i % USERS))
+                for i in range(REVIEWS)])
+
+    @classmethod
+    def tearDownClass(cls):
+        """Removes the database"""
+        cls.engine.dispose()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(cls.path + suffix):
+                os.remove(cls.path + suffix)
+
+    def run_queries(self):
+        """Returns the seconds RUNS executions of each query take"""
+        times = {}
+        with self.engine.connect() as conn:
+            for name, (sql, kind) in QUERIES.items():
+                query = text(sql)
+                start = perf_counter()
+                for i in range(RUNS):
+                    conn.execute(query, {'value': values(kind, i)}).all()
+                times[name] = perf_counter() - start
+        return times
+
+    def test_indexes(self):
+        """Every query is faster with the indexes"""
+        indexed = self.run_queries()
+        with self.engine.begin() as conn:
+            for table in Base.metadata.tables.values():
+                for index in table.indexes:
+                    conn.execute(text("DROP INDEX " + index.name))
+        scanned = self.run_queries()
+        print()
+        for name in QUERIES:
+            print("{:<22} {} runs: {:.3f}s without indexes, {:.3f}s "
+                  "with".format(name, RUNS, scanned[name], indexed[name]))
+        for name in QUERIES:
+            self.assertLess(indexed[name], scanned[name], name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+"""Benchmarks FileStorage against DBStorage on SQLite with the same
+seed_data dataset and prints a side by side report.
+Run with HBNB_BENCH=1 python3 -m unittest tests/test_benchmarks/...
+HBNB_BENCH_SCALE sets the dataset scale (default 1) and
+HBNB_BENCH_REPORT a file to write the results to as JSON.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+ENGINES = ('file', 'db')
+
+
+@unittest.skipIf(os.getenv("HBNB_BENCH") != "1", "Set HBNB_BENCH=1")
+class TestStorageBenchmark(unittest.TestCase):
+    """Runs storage_bench once per engine and compares the results"""
+
+    def run_engine(self, storage_type, scale):
+        """Returns the results of storage_bench for one engine"""
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, HBNB_TYPE_STORAGE=storage_type,
+                       HBNB_DB_URL="sqlite:///" + os.path.join(tmp, "hbnb.db"),
+                       PYTHONPATH=ROOT)
+            env.pop("HBNB_ENV", None)
+            out = subprocess.run(
+                [sys.executable, "-m", "tests.test_benchmarks.storage_bench",
+                 str(scale)], cwd=tmp, env=env, capture_output=True,
+                text=True)
+        self.assertEqual(out.returncode, 0, out.stderr)
+        return json.loads(out.stdout.splitlines()[-1])
+
+    def test_engines(self):
+        """Both engines run every operation"""
+        scale = int(os.getenv("HBNB_BENCH_SCALE", 1))
+        results = {engine: self.run_engine(engine, scale)
+                   for engine in ENGINES}
+        print("\n{} objects, seconds per operation".format(
+            results['file'].pop('objects')))
+        results['db'].pop('objects')
+        print("{:<34}".format("operation") +
+              "".join("{:>10}".format(engine) for engine in ENGINES))
+        for name in results['file']:
+            print("{:<34}".format(name) +
+                  "".join("{:>10.4f}".format(results[engine][name])
+                          for engine in ENGINES))
+        report = os.getenv("HBNB_BENCH_REPORT")
+        if report:
+            with open(report, "w") as f:
+                json.dump({'scale': scale, 'results': results}, f,
+                          indent=2)
+        self.assertEqual(set(results['file']), set(results['db']))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+#!/usr/bin/python3
+"""Benchmarks BaseModel timestamp handling on a 100k object reload.
+Run with HBNB_BENCH=1 python3 -m unittest tests/test_benchmarks/...
+"""
+import json
+import os
+import unittest
+from datetime import datetime, timedelta
+from time import perf_counter
+from unittest.mock import patch
+import models.base_model
+from models.engine.file_storage import FileStorage
+
+SIZE = 100000
+
+
+def strptime(value):
+    """The parsing BaseModel did before fromisoformat"""
+    if isinstance(value, datetime):
+        return value
+    return datetime.strptime(value, '%Y-%m-%dT%H:%M:%S.%f')
+
+
+@unittest.skipIf(os.getenv("HBNB_BENCH") != "1", "Set HBNB_BENCH=1")
+class TestTimestampBenchmark(unittest.TestCase):
+    """Times reload of 100k objects with the old and new parsing"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Writes a file.json of SIZE objects"""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        start = datetime(2024, 1, 1, 0, 0, 0, 1)
+        data = {}
+        for i in range(SIZE):
+            stamp = (start + timedelta(seconds=i)).isoformat()
+            key = "BaseModel.{}".format(i)
+            data[key] = {"id": str(i), "created_at": stamp,
+                         "updated_at": stamp, "__class__": "BaseModel"}
+        with open("file.json", "w") as f:
+            json.dump(data, f)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Restores the original file.json"""
+        os.remove("file.json")
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def reload(self):
+        """Returns the seconds a full reload takes"""
+        FileStorage._FileStorage__objects = {}
+        start = perf_counter()
+        FileStorage().reload()
+        return perf_counter() - start
+
+    def test_reload(self):
+        """fromisoformat reloads faster than strptime"""
+        with patch.object(models.base_model, 'parse_time', strptime):
+            before = self.reload()
+        after = self.reload()
+        print("\nreload {} objects: strptime {:.3f}s, fromisoformat "
+              "{:.3f}s".format(SIZE, before, after))
+        self.assertLess(after, before)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,6 +3,7 @@
 import unittest
 from unittest.mock import patch
 from io import StringIO
+import json
 import os
 import console
 from console import HBNBCommand
@@ -21,6 +22,12 @@ class TestConsole(unittest.TestCase):
         """at the end of the test this will tear it down"""
         del cls.consol
 
+    def setUp(self):
+        """Create the tables, which other DB test classes may drop"""
+        if os.getenv('HBNB_TYPE_STORAGE') == 'db':
+            from models import storage
+            storage.reload()
+
     def tearDown(self):
         """Remove temporary file (file.json) created as a result"""
         if (os.getenv('HBNB_TYPE_STORAGE') != 'db'):
@@ -28,6 +35,9 @@ class TestConsole(unittest.TestCase):
                 os.remove("file.json")
             except Exception:
                 pass
+        else:
+            from models import storage
+            storage.close()
 
     def test_docstrings_in_console(self):
         """checking for docstrings"""
@@ -48,6 +58,134 @@ class TestConsole(unittest.TestCase):
             self.consol.onecmd("\n")
             self.assertEqual('', f.getvalue())
 
+    def test_tokenize(self):
+        """Test splitting arguments without eval"""
+        self.assertEqual(console.tokenize('User 1 "first name" "a \\"b\\""'),
+                         ['User', '1', 'first name', 'a "b"'])
+        self.assertEqual(console.tokenize('"1", {"age": 9}'),
+                         ['1', {'age': 9}])
+        self.assertEqual(console.tokenize('{__import__("os")}'),
+                         ['{__import__("os")}'])
+
+    def test_precmd_dot_syntax(self):
+        """Test that dot syntax is rewritten to plain commands"""
+        precmd = self.consol.precmd
+        self.assertEqual(precmd('User.all()'), 'all User')
+        self.assertEqual(precmd('User.show("1")'), 'show User 1')
+        self.assertEqual(precmd('User.update("1", "name", "A B")'),
+                         'update User 1 "name" "A B"')
+        self.assertEqual(precmd('User.update("1", {"age": 9})'),
+                         "update User 1 {'age': 9}")
+        self.assertEqual(precmd('User.nope()'), 'User.nope()')
+
+    @unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') == 'db',
+                     "uses FileStorage")
+    def test_create_update_values(self):
+        """Test typed create parameters and dictionary updates"""
+        from models import storage
+        with patch('sys.stdout', new=StringIO()) as f:
+            self.consol.onecmd('create Place name="My_\\"house\\"" '
+                               'max_guest=4 latitude=3.5')
+            place_id = f.getvalue().strip()
+            self.consol.onecmd(self.consol.precmd(
+                'Place.update("{}", {{"number_rooms": 2, "city": "SF"}})'
+                .format(place_id)))
+        place = storage.get("Place", place_id)
+        self.assertEqual(place.name, 'My "house"')
+        self.assertEqual(place.max_guest, 4)
+        self.assertEqual(place.latitude, 3.5)
+        self.assertEqual(place.number_rooms, 2)
+        self.assertEqual(place.city, "SF")
+
+    def test_all_pages(self):
+        """Test all output, paging and JSON Lines format"""
+        from models import storage
+        from models.amenity import Amenity
+        for i in range(3):
+            storage.new(Amenity(name="Page{}".format(i)))
+        # all() lists in the order all prints, and keeping the objects
+        # keeps the same instances in a DB session
+        amenities = list(storage.all(Amenity).values())
+        objs = [str(obj) for obj in amenities]
+        with patch('sys.stdout', new=StringIO()) as f:
+            self.consol.onecmd('all Amenity')
+        self.assertEqual(f.getvalue(), str(objs) + '\n')
+        with patch('sys.stdout', new=StringIO()) as f:
+            self.consol.onecmd('all Amenity --offset=1 --limit 1')
+        self.assertEqual(f.getvalue(), str(objs[1:2]) + '\n')
+        with patch('sys.stdout', new=StringIO()) as f:
+            self.consol.onecmd('all Amenity --format=jsonl --limit=2')
+        lines = f.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(json.loads(lines[0])['__class__'], 'Amenity')
+        with patch('sys.stdout', new=StringIO()) as f:
+            self.consol.onecmd('all Amenity --limit=x')
+        self.assertEqual(f.getvalue(), "** invalid option --limit=x **\n")
+
+    def test_find(self):
+        """Test find with filters, in plain and dot syntax"""
+        from models import storage
+        from models.amenity import Amenity
+        amenities = [Amenity(name=name)
+                     for name in ("Wifi", "Pool", "Gym", "Hot_tub")]
+        for amenity in amenities:
+            storage.new(amenity)
+        with patch('sys.stdout', new=StringIO()) as f:
+            self.consol.onecmd('find Amenity name>=Pool name!="Gym"')
+            self.consol.onecmd(self.consol.precmd(
+                'Amenity.find(name="Gym")'))
+            self.consol.onecmd('find Amenity name')
+            self.consol.onecmd('find Amenity name="Hot_tub"')
+            self.consol.onecmd('find Amenity name=Hot_tub')
+        lines = f.getvalue().splitlines()
+        self.assertEqual(lines[0].count("[Amenity]"), 2)
+        self.assertIn("'name': 'Gym'", lines[1])
+        self.assertEqual(lines[2], "** invalid filter name **")
+        for line in lines[3:]:
+            self.assertEqual(line.count("[Amenity]"), 1)
+            self.assertIn(amenities[3].id, line)
+
+    @unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') == 'db',
+                     "counts FileStorage writes")
+    def test_run_script(self):
+        """Test script mode: one batch, failed lines on stderr"""
+        from models import storage
+        with open("script.hbnb", "w") as f:
+            f.write('# comment\ncreate State name="Script"\n'
+                    'create Nope\n\ncount State\n')
+        try:
+            with patch('sys.stdout', new=StringIO()) as out, \
+                    patch('sys.stderr', new=StringIO()) as err, \
+                    patch.object(storage, 'flush') as save:
+                status = self.consol.run_script("script.hbnb")
+        finally:
+            os.remove("script.hbnb")
+        self.assertEqual(status, 1)
+        lines = out.getvalue().split('\n')
+        self.assertEqual(lines[1], "** class doesn't exist **")
+        self.assertIn("line 3: create Nope: ** class doesn't exist **",
+                      err.getvalue())
+        self.assertIn("3 commands", err.getvalue())
+        self.assertIn("1 failed", err.getvalue())
+        self.assertEqual(save.call_count, 1)
+
+    @unittest.skipIf(os.getenv('HBNB_TYPE_STORAGE') == 'db',
+                     "counts FileStorage writes")
+    def test_run_script_flush_every(self):
+        """Test that script mode saves every N commands"""
+        from models import storage
+        with open("script.hbnb", "w") as f:
+            f.write('create State name="A"\n' * 5)
+        try:
+            with patch('sys.stdout', new=StringIO()), \
+                    patch('sys.stderr', new=StringIO()), \
+                    patch.object(storage, 'flush') as save:
+                status = self.consol.run_script("script.hbnb", 2)
+        finally:
+            os.remove("script.hbnb")
+        self.assertEqual(status, 0)
+        self.assertEqual(save.call_count, 3)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,102 @@
+#!/usr/bin/python3
+"""Tests for the FileStorage attribute indexes"""
+import unittest
+from types import SimpleNamespace
+from models.engine.attr_index import AttrIndex
+
+
+class TestAttrIndex(unittest.TestCase):
+    """Tests for models/engine/attr_index.py"""
+
+    def setUp(self):
+        """Index prices, with a text, a missing and an unhashable value"""
+        self.index = AttrIndex('price')
+        prices = {'a': 50, 'b': 100, 'c': 100.0, 'd': 300, 'e': 'free',
+                  'f': None, 'g': [1]}
+        for key, price in prices.items():
+            self.index.add(key, SimpleNamespace(price=price))
+        self.index.add('h', SimpleNamespace())
+
+    def test_equality(self):
+        """= and != use the hash"""
+        self.assertEqual(self.index.find('=', 100), {'b', 'c'})
+        self.assertEqual(self.index.find('=', 'free'), {'e'})
+        self.assertEqual(self.index.find('=', [1]), set())
+        self.assertEqual(self.index.find('!=', 100), {'a', 'd', 'e'})
+
+    def test_ranges(self):
+        """Ranges only compare values of the same kind"""
+        self.assertEqual(self.index.find('<', 100), {'a'})
+        self.assertEqual(self.index.find('<=', 100), {'a', 'b', 'c'})
+        self.assertEqual(self.index.find('>', 100), {'d'})
+        self.assertEqual(self.index.find('>=', 100), {'b', 'c', 'd'})
+        self.assertEqual(self.index.find('>', 'a'), {'e'})
+        with self.assertRaises(ValueError):
+            self.index.find('~', 1)
+
+    def test_ordered(self):
+        """ordered walks numbers, text, then unordered keys by (value,
+        key), either way, from past a (value, key) pair and within a set
+        of keys"""
+        keys = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h']
+        self.assertEqual(list(self.index.ordered()), keys)
+        self.assertEqual(list(self.index.ordered(reverse=True)), keys[::-1])
+        self.assertEqual(list(self.index.ordered(after=(100, 'b'))),
+                         keys[2:])
+        self.assertEqual(list(self.index.ordered(True, (100, 'c'))),
+                         ['b', 'a'])
+        self.assertEqual(list(self.index.ordered(True, ('free', 'e'))),
+                         ['d', 'c', 'b', 'a'])
+        self.assertEqual(list(self.index.ordered(after=(None, 'f'))),
+                         ['g', 'h'])
+        self.assertEqual(list(self.index.ordered(True, ([1], 'g'))),
+                         ['f', 'e', 'd', 'c', 'b', 'a'])
+        self.assertEqual(list(self.index.ordered(keys={'e', 'a', 'f'})),
+                         ['a', 'e', 'f'])
+        self.assertEqual(list(self.index.ordered(True, (300, 'd'), {'a'})),
+                         ['a'])
+        self.assertEqual(list(self.index.ordered(after=(100, 'c'),
+                                                 keys={'g'})), ['g'])
+        self.assertEqual(list(self.index.ordered(
+            keys={'a', 'b', 'd', 'e'}, after=(50, 'a'))), ['b', 'd', 'e'])
+
+    def test_ordered_ignores_case(self):
+        """Text is ordered ignoring case while ranges compare it as is"""
+        index = AttrIndex('name')
+        for key, name in (('a', 'Texas'), ('b', 'alabama'), ('c', 'Ohio')):
+            index.add(key, SimpleNamespace(name=name))
+        self.assertEqual(list(index.ordered()), ['b', 'c', 'a'])
+        self.assertEqual(list(index.ordered(after=('ohio', 'c'))), ['a'])
+        self.assertEqual(list(index.ordered(True, keys={'a', 'b'})),
+                         ['a', 'b'])
+        self.assertEqual(index.find('<', 'Z'), {'a', 'c'})
+        index.discard('a')
+        self.assertEqual(list(index.ordered()), ['b', 'c'])
+
+    def test_build(self):
+        """build gives the index that adding key by key gives"""
+        prices = {'b': 100, 'a': 'free', 'c': None, 'd': 50, 'e': [1]}
+        objects = [(key, SimpleNamespace(price=price))
+                   for key, price in prices.items()]
+        built = AttrIndex.build('price', objects)
+        added = AttrIndex('price')
+        for key, obj in objects:
+            added.add(key, obj)
+        for name in ('values', 'hashed', 'sorted', 'folded', 'unordered'):
+            self.assertEqual(getattr(built, name), getattr(added, name))
+        self.assertEqual(list(built.ordered()), ['d', 'b', 'a', 'c', 'e'])
+
+    def test_update_and_discard(self):
+        """add moves a key to its new value and discard drops it"""
+        self.index.add('a', SimpleNamespace(price=400))
+        self.assertEqual(self.index.find('>', 300), {'a'})
+        self.assertEqual(self.index.find('<', 100), set())
+        self.index.discard('b')
+        self.index.discard('missing')
+        self.assertEqual(self.index.find('=', 100), {'c'})
+        self.assertNotIn(100.0, [v for v, k in self.index.sorted['number']
+                                 if k == 'b'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -17,11 +17,16 @@ from models.user import User
 import json
 import os
 import pycodestyle
+import tempfile
+import threading
 import unittest
+from unittest.mock import patch
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, scoped_session
 
 storage_t = os.getenv("HBNB_TYPE_STORAGE")
+# skip reason of the tests added since, whose decorators would not fit
+db_only = "DB storage tests only applicable if storage type is 'db'"
 if storage_t == 'db':
     models.storage.reload()
 
@@ -65,8 +70,8 @@ class TestDBStorageDocs(unittest.TestCase):
     def test_dbs_func_docstrings(self):
         """Ensure all DBStorage methods have docstrings."""
         for func in self.dbs_funcs:
-            self.assertIsNotNone(func[1].__doc__, f"The {
-                                 func[0]} method lacks a docstring.")
+            self.assertIsNotNone(func[1].__doc__,
+                                 f"The {func[0]} method lacks a docstring.")
 
 
 class TestDBStorage(unittest.TestCase):
@@ -86,7 +91,7 @@ class TestDBStorage(unittest.TestCase):
         """Clean up resources after all tests have run. Only runs when DB storage is used."""
         if storage_t == 'db':
             Base.metadata.drop_all(cls.engine)
-            cls.session.remove()
+            cls.session.close()
 
     @unittest.skipIf(storage_t != 'db', "DB storage tests only applicable if storage type is 'db'")
     def test_all_returns_dict(self):
@@ -145,6 +150,215 @@ class TestDBStorage(unittest.TestCase):
         self.assertEqual(final_count, initial_count + 1,
                          "Failed to create a new User object in the database")
 
+    @unittest.skipIf(storage_t != 'db', db_only)
+    def test_stream(self):
+        """Test that stream yields the same pairs all() returns."""
+        for i in range(3):
+            models.storage.new(State(name="Stream{}".format(i)))
+        models.storage.save()
+        streamed = dict(models.storage.stream(State, chunk=2))
+        self.assertEqual(streamed, models.storage.all(State))
+        self.assertEqual(dict(models.storage.stream()),
+                         models.storage.all())
+
+    @unittest.skipIf(storage_t != 'db', db_only)
+    def test_stream_pages(self):
+        """Test that stream pages in id order across classes."""
+        for i in range(3):
+            models.storage.new(Amenity(name="Page{}".format(i)))
+        models.storage.save()
+        keys = [key for cls in (User, State, City, Place, Review, Amenity)
+                for key in sorted(models.storage.all(cls))]
+        page = [key for key, obj in models.storage.stream(
+            offset=len(keys) - 4, limit=3)]
+        self.assertEqual(page, keys[-4:-1])
+        amenities = sorted(models.storage.all(Amenity))
+        page = [key for key, obj in models.storage.stream(
+            Amenity, offset=1, limit=2)]
+        self.assertEqual(page, amenities[1:3])
+
+    @unittest.skipIf(storage_t != 'db', db_only)
+    def test_get_count(self):
+        """Test get by primary key and count with COUNT(*)."""
+        total = models.storage.count()
+        states = models.storage.count(State)
+        state = State(name="GetCount")
+        models.storage.new(state)
+        models.storage.save()
+        self.assertIs(models.storage.get(State, state.id), state)
+        self.assertIs(models.storage.get("State", state.id), state)
+        self.assertIsNone(models.storage.get(State, "missing"))
+        self.assertEqual(models.storage.count("State"), states + 1)
+        self.assertEqual(models.storage.count(), total + 1)
+
+    @unittest.skipIf(storage_t != 'db', db_only)
+    def test_eager_load_query_count(self):
+        """Test that load presets fetch relationships in fixed queries."""
+        from sqlalchemy import event
+        engine = models.storage._DBStorage__engine
+        statements = []
+
+        def count(*args):
+            statements.append(args[2])
+
+        def cities_page():
+            models.storage.close()
+            del statements[:]
+            for state in models.storage.all(State, load='cities').values():
+                [city.name for city in state.cities]
+            return len(statements)
+
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            sizes = []
+            for i in range(2):
+                for j in range(3):
+                    state = State(name="Eager{}{}".format(i, j))
+                    models.storage.new(state)
+                    models.storage.new(City(name="C", state_id=state.id))
+                models.storage.save()
+                sizes.append(cities_page())
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+        self.assertEqual(sizes[0], sizes[1])
+
+    @unittest.skipIf(storage_t != 'db', db_only)
+    def test_find(self):
+        """Test that find filters in SQL."""
+        states = [State(name="Find{}".format(i)) for i in range(3)]
+        models.storage.new_many(states)
+        models.storage.save()
+        found = models.storage.find(State, [('name', '>', "Find0"),
+                                            ('name', '!=', "Find2")])
+        self.assertEqual(list(found), ['State.' + states[1].id])
+        self.assertEqual(models.storage.find("State", [('nope', '=', 1)]),
+                         {})
+
+    @unittest.skipIf(storage_t != 'db', db_only)
+    def test_query(self):
+        """Test that query filters, orders and pages in SQL."""
+        states = [State(name="Query{}".format(i % 2)) for i in range(4)]
+        for state in states:
+            models.storage.new(state)
+        models.storage.save()
+        where = [('name', '>=', "Query0"), ('name', '<=', "Query1")]
+        by_name = sorted(states, key=lambda state: (state.name, state.id))
+        self.assertEqual(models.storage.query(State, where, 'name'),
+                         by_name)
+        self.assertEqual(models.storage.query("State", where, '-name'),
+                         by_name[::-1])
+        page = models.storage.query(State, where, 'name', limit=3)
+        self.assertEqual(page, by_name[:3])
+        self.assertEqual(models.storage.query(State, where, 'name',
+                                              after=page[-1]), by_name[3:])
+        self.assertEqual(models.storage.query(
+            State, where, '-name', after=(page[1].name, page[1].id)),
+            by_name[:1])
+        self.assertEqual(models.storage.query(State, {'name': "Query1"}),
+                         sorted(by_name[2:], key=lambda state: state.id))
+        self.assertEqual(models.storage.query(State, {'nope': 1}), [])
+        self.assertEqual(models.storage.query(State, order_by='nope'), [])
+
+    @unittest.skipIf(storage_t != 'db', db_only)
+    def test_query_ignores_case(self):
+        """Test that query and State.cities order text ignoring case."""
+        state = State(name="Case")
+        cities = [City(name=name, state_id=state.id)
+                  for name in ("Texas", "alabama", "Ohio")]
+        for obj in [state] + cities:
+            models.storage.new(obj)
+        models.storage.save()
+        where = {'state_id': state.id}
+        order = [cities[1], cities[2], cities[0]]
+        self.assertEqual(models.storage.query(City, where, 'name'), order)
+        self.assertEqual(models.storage.query(City, where, 'name',
+                                              after=("ohio", cities[2].id)),
+                         order[2:])
+        models.storage.close()
+        self.assertEqual([city.name for city in models.storage.get(
+            State, state.id).cities], ["alabama", "Ohio", "Texas"])
+
+    @unittest.skipIf(storage_t != 'db', db_only)
+    def test_query_nulls_last(self):
+        """Test that query orders NULLs last, either way, as FileStorage."""
+        users = [User(email="q@hbnb.io", password="pwd", first_name=name)
+                 for name in ("B", None, "A", None)]
+        for user in users:
+            models.storage.new(user)
+        models.storage.save()
+        where = {'email': "q@hbnb.io"}
+        named = sorted(users[::2], key=lambda user: user.first_name)
+        unnamed = sorted(users[1::2], key=lambda user: user.id)
+        order = named + unnamed
+        self.assertEqual(models.storage.query(User, where, 'first_name'),
+                         order)
+        self.assertEqual(models.storage.query(User, where, '-first_name'),
+                         order[::-1])
+        for i, user in enumerate(order):
+            self.assertEqual(models.storage.query(
+                User, where, 'first_name', after=user), order[i + 1:])
+            self.assertEqual(models.storage.query(
+                User, where, '-first_name', after=user), order[:i][::-1])
+
+    @unittest.skipIf(storage_t != 'db', db_only)
+    def test_unmapped_class(self):
+        """Test that a class with no table, such as BaseModel, has no
+        objects instead of raising."""
+        from models.base_model import BaseModel
+        for cls in (BaseModel, "BaseModel", "Nope"):
+            self.assertIsNone(models.storage.get(cls, "1"))
+            self.assertEqual(models.storage.count(cls), 0)
+            self.assertEqual(models.storage.all(cls), {})
+            self.assertEqual(models.storage.find(cls, []), {})
+            self.assertEqual(models.storage.query(cls), [])
+
+    @unittest.skipIf(storage_t != 'db', db_only)
+    def test_new_many(self):
+        """Test that new_many inserts parents and children in bulk."""
+        states = [State(name="Bulk{}".format(i)) for i in range(5)]
+        cities = [City(name="BulkCity", state_id=state.id)
+                  for state in states]
+        count = models.storage.count(City)
+        self.assertEqual(
+            models.storage.new_many(cities + states, chunk=2), 10)
+        models.storage.save()
+        models.storage.close()
+        self.assertEqual(models.storage.count(City), count + 5)
+        state = models.storage.get(State, states[0].id)
+        self.assertEqual(state.name, "Bulk0")
+        self.assertEqual([city.id for city in state.cities],
+                         [cities[0].id])
+
+    @unittest.skipIf(storage_t != 'db', db_only)
+    def test_new_many_then_save(self):
+        """Test that objects added by new_many save as UPDATEs."""
+        states = [State(name="Saved{}".format(i)) for i in range(2)]
+        models.storage.new_many(states)
+        models.storage.save()
+        self.assertIs(models.storage.get(State, states[0].id), states[0])
+        states[0].name = "Renamed"
+        states[0].save()
+        models.storage.close()
+        self.assertEqual(models.storage.get(State, states[0].id).name,
+                         "Renamed")
+
+    @unittest.skipIf(storage_t != 'db', db_only)
+    def test_batch_rollback(self):
+        """Test that batch() commits once and rolls back on error."""
+        with models.storage.batch():
+            kept = State(name="BatchKept")
+            models.storage.new(kept)
+            models.storage.save()
+        with self.assertRaises(ValueError):
+            with models.storage.batch():
+                dropped = State(name="BatchDropped")
+                models.storage.new(dropped)
+                models.storage.save()
+                raise ValueError
+        names = [s.name for s in models.storage.all(State).values()]
+        self.assertIn("BatchKept", names)
+        self.assertNotIn("BatchDropped", names)
+
     @unittest.skipIf(storage_t != 'db', "DB storage tests only applicable if storage type is 'db'")
     def test_reload(self):
         """Test reloading objects from the database."""
@@ -154,5 +368,80 @@ class TestDBStorage(unittest.TestCase):
                              "Session should be initialized on reload")
 
 
+class TestDBStorageEngine(unittest.TestCase):
+    """Tests for the engine settings, on a SQLite file so they need no
+    MySQL server and run whatever the storage type."""
+
+    def setUp(self):
+        """Create an empty database file."""
+        fd, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+
+    def tearDown(self):
+        """Remove the database file."""
+        os.remove(self.path)
+
+    def test_pool_settings(self):
+        """Test that the HBNB_DB_* variables configure the pool."""
+        env = {"HBNB_DB_POOL_SIZE": "3", "HBNB_DB_MAX_OVERFLOW": "2",
+               "HBNB_DB_POOL_RECYCLE": "60", "HBNB_DB_POOL_PRE_PING": "0"}
+        with patch.dict(os.environ, env):
+            storage = DBStorage("sqlite:///" + self.path)
+        pool = storage._DBStorage__engine.pool
+        self.assertEqual(pool.size(), 3)
+        self.assertEqual(pool._max_overflow, 2)
+        self.assertEqual(pool._recycle, 60)
+        self.assertFalse(pool._pre_ping)
+
+    def test_pool_stats(self):
+        """Test that pool_stats reports checked out connections."""
+        storage = DBStorage("sqlite:///" + self.path)
+        storage.reload()
+        self.assertEqual(storage.count(State), 0)
+        stats = storage.pool_stats()
+        self.assertEqual(stats['pool'], 'QueuePool')
+        self.assertEqual(stats['checkedout'], 1)
+        storage.close()
+        stats = storage.pool_stats()
+        self.assertEqual(stats['checkedout'], 0)
+        self.assertEqual(stats['checkedin'], 1)
+
+    def test_indexes(self):
+        """Test that reload creates the lookup indexes."""
+        from sqlalchemy import inspect
+        storage = DBStorage("sqlite:///" + self.path)
+        storage.reload()
+        inspector = inspect(storage._DBStorage__engine)
+        indexes = {table: {index['name']: index['column_names']
+                           for index in inspector.get_indexes(table)}
+                   for table in ('states', 'cities', 'places', 'reviews',
+                                 'users')}
+        self.assertEqual(indexes['states']['ix_states_name'], ['name'])
+        self.assertEqual(indexes['cities']['ix_cities_state_id_name'],
+                         ['state_id', 'name'])
+        self.assertEqual(
+            indexes['places']['ix_places_city_id_price_by_night'],
+            ['city_id', 'price_by_night'])
+        self.assertIn('ix_places_price_by_night', indexes['places'])
+        self.assertIn('ix_reviews_place_id', indexes['reviews'])
+        self.assertIn('ix_users_email', indexes['users'])
+
+    def test_thread_sessions(self):
+        """Test that each thread gets its own session and that close
+        discards the current one."""
+        storage = DBStorage("sqlite:///" + self.path)
+        storage.reload()
+        registry = storage._DBStorage__session
+        first = registry()
+        others = []
+        thread = threading.Thread(target=lambda: others.append(registry()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(others[0], first)
+        self.assertIs(registry(), first)
+        storage.close()
+        self.assertIsNot(registry(), first)
+
+
 if __name__ == "__main__":
     unittest.main()
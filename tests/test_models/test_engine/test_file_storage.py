@@ -5,6 +5,7 @@ import unittest
 from models.base_model import BaseModel
 from models import storage
 import os
+import json
 from unittest.mock import patch
 from io import StringIO
 from console import HBNBCommand
@@ -46,6 +47,14 @@ class test_fileStorage(unittest.TestCase):
             os.remove('file.json')
         except:
             pass
+        try:
+            os.remove('file.json.journal')
+        except:
+            pass
+        try:
+            os.remove('file.json.lock')
+        except:
+            pass
 
     def test_obj_list_empty(self):
         """ __objects is initially empty """
@@ -125,6 +134,499 @@ class test_fileStorage(unittest.TestCase):
             temp = key
         self.assertEqual(temp, 'BaseModel' + '.' + _id)
 
+    def test_all_by_class(self):
+        """ all(cls) returns only objects of that class """
+        from models.state import State
+        base = BaseModel()
+        state = State()
+        storage.new(base)
+        storage.new(state)
+        self.assertEqual(list(storage.all(State).values()), [state])
+        self.assertEqual(list(storage.all("BaseModel").values()), [base])
+
+    def test_all_by_class_after_delete(self):
+        """ Deleted objects leave the class index """
+        new = BaseModel()
+        storage.new(new)
+        storage.delete(new)
+        self.assertEqual(storage.all(BaseModel), {})
+
+    def test_count(self):
+        """ count returns totals per class and overall """
+        from models.state import State
+        storage.new(BaseModel())
+        storage.new(State())
+        storage.new(State())
+        self.assertEqual(storage.count(), 3)
+        self.assertEqual(storage.count(State), 2)
+        self.assertEqual(storage.count("BaseModel"), 1)
+        self.assertEqual(storage.count("City"), 0)
+
+    def test_console_count(self):
+        """ count command reports storage.count for a class """
+        from models.state import State
+        storage.new(State())
+        with patch('sys.stdout', new_callable=StringIO) as out:
+            HBNBCommand().onecmd('count State')
+            HBNBCommand().onecmd('count Nope')
+        self.assertEqual(out.getvalue().split('\n')[:2],
+                         ['1', "** class doesn't exist **"])
+
+    def test_find(self):
+        """ find filters through indexes kept up to date """
+        from models.place import Place
+        cheap = Place(name="Cheap", price_by_night=50)
+        mid = Place(name="Mid", price_by_night=100)
+        storage.new_many([cheap, mid])
+        self.assertEqual(list(storage.find(Place, [
+            ('price_by_night', '<=', 100), ('name', '=', "Mid")])),
+            ['Place.' + mid.id])
+        cheap.price_by_night = 150
+        pricey = Place(name="Pricey", price_by_night=300)
+        storage.new(pricey)
+        storage.delete(mid)
+        found = storage.find('Place', [('price_by_night', '>', 100)])
+        self.assertEqual(sorted(found),
+                         sorted(['Place.' + cheap.id, 'Place.' + pricey.id]))
+        self.assertEqual(storage.find(Place, [('nope', '=', 1)]), {})
+        self.assertEqual(len(storage.find(Place, [])), 2)
+
+    def test_query(self):
+        """ query filters, orders and pages from the indexes """
+        from models.state import State
+        from models.city import City
+        states = [State(name=name) for name in ("B", "A", "C", "A")]
+        storage.new_many(states)
+        by_name = sorted(states, key=lambda state: (state.name, state.id))
+        self.assertEqual(storage.query(State, order_by='name'), by_name)
+        self.assertEqual(storage.query('State', order_by='-name'),
+                         by_name[::-1])
+        page = storage.query(State, order_by='name', limit=2)
+        self.assertEqual(page, by_name[:2])
+        self.assertEqual(storage.query(State, order_by='name',
+                                       after=page[-1]), by_name[2:])
+        self.assertEqual(storage.query(State, order_by='name',
+                                       after=("A", page[-1].id)),
+                         by_name[2:])
+        self.assertEqual(storage.query(State, where={'name': "A"}),
+                         sorted(by_name[:2], key=lambda state: state.id))
+        self.assertEqual(storage.query(State, [('name', '>', "A")],
+                                       order_by='-name'), by_name[:1:-1])
+        by_name[0].name = "D"
+        self.assertEqual(storage.query(State, order_by='name')[-1],
+                         by_name[0])
+        self.assertEqual(storage.query(State, {'nope': 1}), [])
+        self.assertEqual(storage.query(State, order_by='nope'), [])
+        lower = State(name="alabama")
+        storage.new(lower)
+        self.assertEqual(storage.query(State, order_by='name')[:3],
+                         [by_name[1], lower, by_name[2]])
+        cities = [City(state_id=states[0].id, name=name)
+                  for name in ("Z", "M", "A")]
+        storage.new_many(cities)
+        self.assertEqual(states[0].cities, cities[::-1])
+        unnamed = City(state_id=states[0].id)
+        storage.new(unnamed)
+        self.assertEqual(states[0].cities, cities[::-1] + [unnamed])
+        self.assertEqual(storage.query(City, order_by='-name',
+                                       after=cities[1]), [cities[2]])
+
+    def test_stream(self):
+        """ stream pages through a class or everything """
+        from models.state import State
+        states = [State() for i in range(4)]
+        storage.new_many(states)
+        storage.new(BaseModel())
+        keys = ['State.' + state.id for state in states]
+        self.assertEqual([key for key, obj in storage.stream(State)], keys)
+        self.assertEqual([key for key, obj in storage.stream(
+            'State', offset=1, limit=2)], keys[1:3])
+        self.assertEqual(len(list(storage.stream(offset=3))), 2)
+
+    def test_new_many(self):
+        """ new_many adds every object and indexes them """
+        from models.state import State
+        from models.city import City
+        state = State()
+        cities = [City(state_id=state.id) for i in range(3)]
+        self.assertEqual(storage.new_many([state] + cities), 4)
+        self.assertEqual(storage.count(City), 3)
+        self.assertEqual(len(state.cities), 3)
+        storage.save()
+        storage.reload()
+        self.assertIn('State.' + state.id, storage.all())
+
+    def test_console_load(self):
+        """ load command bulk loads a JSON Lines file """
+        from models.state import State
+        states = [State(name="S{}".format(i)) for i in range(3)]
+        with open('load.jsonl', 'w') as f:
+            for state in states:
+                f.write(json.dumps(state.to_dict()) + '\n')
+            f.write('{"__class__": "Nope"}\n')
+        try:
+            with patch('sys.stdout', new_callable=StringIO) as out:
+                HBNBCommand().onecmd('load load.jsonl')
+        finally:
+            os.remove('load.jsonl')
+        self.assertEqual(out.getvalue().split('\n')[:2],
+                         ['** invalid object on line 4 **', '3'])
+        self.assertEqual(storage.get(State, states[1].id).name, "S1")
+
+    def test_state_cities_index(self):
+        """ State.cities follows new, delete and state_id updates """
+        from models.state import State
+        from models.city import City
+        state = State()
+        other = State()
+        city = City(state_id=state.id)
+        storage.new(state)
+        storage.new(city)
+        self.assertEqual(state.cities, [city])
+        city.state_id = other.id
+        self.assertEqual(state.cities, [])
+        self.assertEqual(other.cities, [city])
+        storage.delete(city)
+        self.assertEqual(other.cities, [])
+
+    def test_place_reviews_and_amenities(self):
+        """ Place.reviews and Place.amenities are resolved from storage """
+        from models.place import Place
+        from models.review import Review
+        from models.amenity import Amenity
+        place = Place()
+        review = Review(place_id=place.id)
+        amenity = Amenity()
+        storage.new(review)
+        storage.new(amenity)
+        place.amenities = amenity
+        place.amenities = amenity
+        self.assertEqual(place.reviews, [review])
+        self.assertEqual(place.amenities, [amenity])
+        self.assertEqual(Place().amenity_ids, [])
+
+    def test_journal_appends_changes(self):
+        """ Journal mode appends changed keys instead of rewriting """
+        from models.engine.file_storage import FileStorage
+        with patch.dict(os.environ, {"HBNB_FILE_JOURNAL": "1"}):
+            fs = FileStorage()
+        fs.save()
+        first = BaseModel()
+        fs.new(first)
+        fs.save()
+        second = BaseModel()
+        fs.new(second)
+        fs.delete(first)
+        fs.save()
+        with open('file.json') as f:
+            self.assertEqual(f.read(), '{}')
+        with open('file.json.journal') as f:
+            self.assertEqual(len(f.readlines()), 3)
+        FileStorage._FileStorage__objects = {}
+        fs.reload()
+        self.assertEqual(list(fs.all().keys()),
+                         ['BaseModel.' + second.id])
+
+    def test_journal_compaction(self):
+        """ The journal is folded into file.json past its threshold """
+        from models.engine.file_storage import FileStorage
+        with patch.dict(os.environ, {"HBNB_FILE_JOURNAL": "1",
+                                     "HBNB_FILE_JOURNAL_MAX": "2"}):
+            fs = FileStorage()
+        for i in range(4):
+            fs.new(BaseModel())
+            fs.save()
+        self.assertTrue(os.path.exists('file.json'))
+        self.assertFalse(os.path.exists('file.json.journal'))
+        FileStorage._FileStorage__objects = {}
+        fs.reload()
+        self.assertEqual(fs.count(), 4)
+
+    def test_save_encodes_only_changed(self):
+        """ save() only calls to_dict on objects changed since last save """
+        first = BaseModel()
+        second = BaseModel()
+        storage.new(first)
+        storage.new(second)
+        storage.save()
+        first.name = "changed"
+        from models.engine.file_storage import FileStorage
+        record = FileStorage._FileStorage__record
+        with patch.object(FileStorage, '_FileStorage__record',
+                          autospec=True, side_effect=record) as encode:
+            storage.save()
+        self.assertEqual(encode.call_count, 1)
+        expected = {'BaseModel.' + first.id: first.to_dict(),
+                    'BaseModel.' + second.id: second.to_dict()}
+        with open('file.json') as f:
+            self.assertEqual(f.read(), json.dumps(
+                expected, separators=(',', ':'), ensure_ascii=False))
+
+    def test_batch_saves_once(self):
+        """ save() calls inside batch() are deferred to a single write """
+        with patch.object(storage, '_FileStorage__write_snapshot') as write:
+            with storage.batch():
+                for i in range(5):
+                    BaseModel().save()
+                self.assertEqual(write.call_count, 0)
+            self.assertEqual(write.call_count, 1)
+        self.assertEqual(storage.count(BaseModel), 5)
+
+    def test_batch_rollback(self):
+        """ An exception inside batch() restores the objects """
+        from models.state import State
+        from models.city import City
+        state = State(name="Kept")
+        city = City(state_id=state.id)
+        storage.new(state)
+        storage.new(city)
+        storage.save()
+        with self.assertRaises(ValueError):
+            with storage.batch():
+                BaseModel().save()
+                state.name = "Changed"
+                city.state_id = "elsewhere"
+                storage.delete(state)
+                raise ValueError
+        self.assertEqual(storage.count(), 2)
+        self.assertEqual(state.name, "Kept")
+        self.assertEqual(state.cities, [city])
+        with open('file.json') as f:
+            self.assertNotIn('Changed', f.read())
+
+    def test_batch_other_thread(self):
+        """ A batch defers and rolls back only its own thread's saves """
+        import threading
+        other = BaseModel()
+
+        def save_other():
+            storage.new(other)
+            storage.save()
+
+        with self.assertRaises(ValueError):
+            with storage.batch():
+                BaseModel().save()
+                thread = threading.Thread(target=save_other)
+                thread.start()
+                thread.join()
+                with open('file.json') as f:
+                    self.assertIn(other.id, f.read())
+                raise ValueError
+        self.assertEqual(list(storage.all()), ['BaseModel.' + other.id])
+
+    def test_batch_rollback_takes_lock(self):
+        """ A rollback waits for a write holding the storage lock """
+        import threading
+        import time
+        from models.engine.file_storage import FileStorage
+        lock = FileStorage._FileStorage__lock
+        held = threading.Event()
+        released = []
+
+        def write():
+            with lock:
+                held.set()
+                time.sleep(0.2)
+                released.append(time.perf_counter())
+
+        thread = threading.Thread(target=write)
+        with self.assertRaises(ValueError):
+            with storage.batch():
+                BaseModel().save()
+                thread.start()
+                held.wait()
+                raise ValueError
+        rolled_back = time.perf_counter()
+        thread.join()
+        self.assertGreaterEqual(rolled_back, released[0])
+        self.assertEqual(storage.count(), 0)
+
+    def test_lazy_reload(self):
+        """ A lazy reload builds instances only when they are used """
+        from datetime import datetime
+        from models.engine.file_storage import FileStorage
+        from models.state import State
+        from models.city import City
+        state = State(name="Lazy")
+        city = City(name="Town", state_id=state.id)
+        storage.new(state)
+        storage.new(city)
+        storage.new(BaseModel())
+        storage.save()
+        with open('file.json') as f:
+            saved = f.read()
+        with patch.dict(os.environ, {"HBNB_FILE_LAZY": "1"}):
+            fs = FileStorage()
+        FileStorage._FileStorage__objects = {}
+        fs.reload()
+        self.assertEqual(FileStorage._FileStorage__objects, {})
+        self.assertEqual(fs.count(), 3)
+        self.assertEqual(fs.count(City), 1)
+        loaded = fs.get(State, state.id)
+        self.assertIsInstance(loaded.created_at, datetime)
+        self.assertEqual(len(FileStorage._FileStorage__objects), 1)
+        self.assertEqual([c.name for c in loaded.cities], ["Town"])
+        self.assertEqual(len(FileStorage._FileStorage__objects), 2)
+        fs.save()
+        with open('file.json') as f:
+            self.assertEqual(json.loads(f.read()), json.loads(saved))
+        self.assertEqual(len(fs.all()), 3)
+
+    def test_lazy_reload_twice(self):
+        """ Reloading lazily keeps objects already built only once """
+        from models.engine.file_storage import FileStorage
+        from models.state import State
+        state = State(name="Once")
+        storage.new(state)
+        storage.save()
+        with patch.dict(os.environ, {"HBNB_FILE_LAZY": "1"}):
+            fs = FileStorage()
+        FileStorage._FileStorage__objects = {}
+        fs.reload()
+        self.assertEqual(len(fs.query(State, order_by='name')), 1)
+        fs.reload()
+        fs.reload()
+        self.assertEqual(fs.count('State'), 1)
+        self.assertEqual(fs.get(State, state.id).name, "Once")
+        fs.save()
+        with open('file.json') as f:
+            self.assertEqual(f.read().count('"State.' + state.id), 1)
+
+    def test_iter_members_chunks(self):
+        """ The streaming parser copes with members split across reads """
+        from io import StringIO
+        from models.engine.file_storage import _iter_members
+        data = {"A.1": {"name": "x, y: {z}"}, "B.2": {"n": [1, 2]}}
+        text = json.dumps(data)
+        members = list(_iter_members(StringIO(text), size=5))
+        self.assertEqual({k: v for k, v, t in members}, data)
+        self.assertEqual([json.loads(t) for k, v, t in members],
+                         list(data.values()))
+        self.assertEqual(list(_iter_members(StringIO(' { } '))), [])
+        with self.assertRaises(ValueError):
+            list(_iter_members(StringIO('{"A.1": {"a": 1}')))
+
+    def test_save_is_atomic(self):
+        """ A failed save leaves the previous file.json in place """
+        storage.new(BaseModel())
+        storage.save()
+        with open('file.json') as f:
+            before = f.read()
+        storage.new(BaseModel())
+        with patch('os.replace', side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                storage.save()
+        with open('file.json') as f:
+            self.assertEqual(f.read(), before)
+        self.assertEqual([name for name in os.listdir('.')
+                          if name.endswith('.tmp')], [])
+
+    def test_background_writer(self):
+        """ With a write interval, saves are coalesced by a thread """
+        import time
+        from models.engine.file_storage import FileStorage
+        with patch.dict(os.environ, {"HBNB_FILE_WRITE_INTERVAL": "0.05"}):
+            fs = FileStorage()
+        with patch.object(FileStorage, 'flush', autospec=True,
+                          side_effect=FileStorage.flush) as flush:
+            for i in range(50):
+                fs.new(BaseModel())
+                fs.save()
+            time.sleep(0.3)
+        self.assertLess(flush.call_count, 10)
+        with open('file.json') as f:
+            self.assertEqual(len(json.load(f)), 50)
+
+    def test_background_writer_at_exit(self):
+        """ A save the writer is still writing at exit is not lost """
+        import subprocess
+        import sys
+        code = """import time
+from models.engine.file_storage import FileStorage
+from models.base_model import BaseModel
+from models import storage
+replace = FileStorage._FileStorage__replace
+
+
+def slow_replace(*args):
+    time.sleep(0.3)
+    return replace(*args)
+
+
+FileStorage._FileStorage__replace = slow_replace
+storage.new(BaseModel(id="kept"))
+storage.save()
+time.sleep(0.1)
+"""
+        env = dict(os.environ, HBNB_FILE_WRITE_INTERVAL="0.5")
+        subprocess.run([sys.executable, "-c", code], env=env, check=True)
+        with open('file.json') as f:
+            self.assertIn('BaseModel.kept', json.load(f))
+
+    def test_journal_torn_line(self):
+        """ A line cut short by a crash is left out on reload """
+        from models.engine.file_storage import FileStorage
+        with patch.dict(os.environ, {"HBNB_FILE_JOURNAL": "1"}):
+            fs = FileStorage()
+        fs.save()
+        kept = BaseModel()
+        fs.new(kept)
+        fs.save()
+        with open('file.json.journal', 'a') as f:
+            f.write('{"BaseModel.x": {"id": "x"')
+        FileStorage._FileStorage__objects = {}
+        fs.reload()
+        self.assertEqual(list(fs.all()), ['BaseModel.' + kept.id])
+
+    def other_process(self, code):
+        """ Runs code in a separate python process sharing file.json """
+        import subprocess
+        import sys
+        env = dict(os.environ, HBNB_FILE_SHARED="1")
+        subprocess.run([sys.executable, "-c",
+                        "from models import storage\n" + code],
+                       env=env, check=True)
+
+    def test_refresh_picks_up_other_process(self):
+        """ refresh() reloads only after another process saved """
+        from models.engine.file_storage import FileStorage
+        with patch.dict(os.environ, {"HBNB_FILE_SHARED": "1"}):
+            fs = FileStorage()
+        mine = BaseModel()
+        fs.new(mine)
+        fs.save()
+        self.assertFalse(fs.refresh())
+        self.other_process(
+            "from models.state import State\n"
+            "State(name='Other').save()")
+        unsaved = BaseModel()
+        fs.new(unsaved)
+        self.assertTrue(fs.refresh())
+        self.assertEqual(fs.count(), 3)
+        self.assertEqual(fs.count("State"), 1)
+        self.assertIs(fs.get(BaseModel, unsaved.id), unsaved)
+        self.assertFalse(fs.refresh())
+
+    def test_merge_on_save(self):
+        """ With HBNB_FILE_MERGE, saves keep what other processes wrote """
+        from models.engine.file_storage import FileStorage
+        with patch.dict(os.environ, {"HBNB_FILE_MERGE": "1"}):
+            fs = FileStorage()
+        first = BaseModel()
+        fs.new(first)
+        fs.save()
+        self.other_process(
+            "from models.state import State\n"
+            "State(name='Other').save()")
+        fs.delete(first)
+        fs.new(BaseModel())
+        fs.save()
+        with open('file.json') as f:
+            saved = json.load(f)
+        self.assertEqual(sorted(key.split('.')[0] for key in saved),
+                         ['BaseModel', 'State'])
+        self.assertNotIn('BaseModel.' + first.id, saved)
+
     def test_storage_var_created(self):
         """ FileStorage object storage created """
         from models.engine.file_storage import FileStorage
@@ -0,0 +1,97 @@
+#!/usr/bin/python3
+"""Round-trip tests for the FileStorage JSON codecs"""
+import os
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+from models.engine.json_codec import codecs, get_codec, JsonCodec
+from models.engine.file_storage import FileStorage
+from models.base_model import BaseModel
+
+record = {
+    "id": "5e3c-été/☃",
+    "name": "Café \"quoted\" \\ <tag> \U0001F600",
+    "number_rooms": 3,
+    "latitude": 37.7749,
+    "longitude": -122.4194,
+    "amenity_ids": ["a", "b"],
+    "description": None,
+    "created_at": datetime(2024, 3, 21, 3, 22, 27, 291556),
+    "updated_at": datetime(2024, 3, 21, 3, 22, 27),
+    "__class__": "Place"
+    }
+
+
+def installed():
+    """Returns an instance of every codec that can be imported"""
+    found = []
+    for name, codec in codecs.items():
+        try:
+            found.append(codec())
+        except ImportError:
+            pass
+    return found
+
+
+class TestJsonCodec(unittest.TestCase):
+    """Every installed codec must write the same bytes as the json one"""
+
+    def tearDown(self):
+        """Remove the file written by the storage tests"""
+        try:
+            os.remove("file.json")
+        except FileNotFoundError:
+            pass
+
+    def test_dumps_matches_json(self):
+        """Encodings are byte-identical across codecs"""
+        expected = JsonCodec().dumps(record)
+        for codec in installed():
+            self.assertEqual(codec.dumps(record), expected, codec.name)
+
+    def test_round_trip(self):
+        """Decoding gives back the record with ISO 8601 timestamps"""
+        expected = dict(record)
+        expected["created_at"] = record["created_at"].isoformat()
+        expected["updated_at"] = record["updated_at"].isoformat()
+        for codec in installed():
+            self.assertEqual(codec.loads(codec.dumps(record)), expected,
+                             codec.name)
+
+    def test_fallback(self):
+        """Missing codecs fall back, unknown names are refused"""
+        self.assertEqual(get_codec("json").name, "json")
+        self.assertIn(get_codec().name, codecs)
+        with patch.object(codecs["orjson"], "__init__",
+                          side_effect=ImportError):
+            self.assertNotEqual(get_codec("orjson").name, "orjson")
+        with self.assertRaises(ValueError):
+            get_codec("yaml")
+
+    def test_storage_files_identical(self):
+        """FileStorage writes the same file.json with every codec"""
+        saved = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        try:
+            obj = BaseModel(**{k: v for k, v in record.items()
+                               if k != "__class__"})
+            outputs = {}
+            for codec in installed():
+                with patch.dict(os.environ, {"HBNB_JSON_CODEC": codec.name}):
+                    fs = FileStorage()
+                FileStorage._FileStorage__objects = {}
+                fs.new(obj)
+                fs.save()
+                with open("file.json", "rb") as f:
+                    outputs[codec.name] = f.read()
+                FileStorage._FileStorage__objects = {}
+                fs.reload()
+                self.assertEqual(fs.get(BaseModel, obj.id).to_dict(),
+                                 obj.to_dict())
+            self.assertEqual(len(set(outputs.values())), 1, outputs)
+        finally:
+            FileStorage._FileStorage__objects = saved
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+"""Tests for the binary FileStorage snapshot format"""
+import io
+import json
+import os
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+from models.engine import snapshot
+from models.engine.file_storage import FileStorage
+from models.base_model import BaseModel
+from models.state import State
+
+
+class TestSnapshot(unittest.TestCase):
+    """Tests for models/engine/snapshot.py and its use by FileStorage"""
+
+    def setUp(self):
+        """Empty the storage, keeping its objects for tearDown"""
+        self.saved = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        """Restore the storage and remove the files written"""
+        FileStorage._FileStorage__objects = self.saved
+        for path in ('file.json', 'file.pickle', 'file.pickle.journal',
+                     'converted.json'):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def test_dump_load(self):
+        """Records of different shapes survive a round trip"""
+        stamp = datetime(2024, 1, 2, 3, 4, 5, 6)
+        records = [
+            {'id': '1', 'name': 'a', 'created_at': stamp,
+             '__class__': 'State'},
+            {'id': '2', 'name': 'b', 'created_at': stamp,
+             '__class__': 'State'},
+            {'id': '3', 'created_at': stamp, '__class__': 'State'},
+            {'id': '4', 'text': 'ok', '__class__': 'Review'},
+            ]
+        f = io.BytesIO()
+        snapshot.dump(records, f)
+        f.seek(0)
+        loaded = dict(snapshot.load(f))
+        self.assertEqual(loaded, {r['__class__'] + '.' + r['id']: r
+                                  for r in records})
+
+    def test_load_empty(self):
+        """An empty file is refused like an empty file.json"""
+        with self.assertRaises(ValueError):
+            list(snapshot.load(io.BytesIO()))
+
+    def test_storage_round_trip(self):
+        """FileStorage saves and reloads through the binary format"""
+        with patch.dict(os.environ, {"HBNB_FILE_FORMAT": "pickle"}):
+            fs = FileStorage()
+        state = State(name="Binary")
+        fs.new(state)
+        fs.new(BaseModel())
+        fs.save()
+        self.assertTrue(snapshot.is_snapshot('file.pickle'))
+        self.assertFalse(os.path.exists('file.json'))
+        FileStorage._FileStorage__objects = {}
+        fs.reload()
+        self.assertEqual(fs.count(), 2)
+        self.assertEqual(fs.get(State, state.id).to_dict(), state.to_dict())
+
+    def test_convert(self):
+        """convert migrates file.json to the binary format and back"""
+        fs = FileStorage()
+        for i in range(20):
+            fs.new(State(name="State {}".format(i)))
+        fs.save()
+        self.assertEqual(snapshot.convert('file.json', 'file.pickle'), 20)
+        self.assertLess(os.path.getsize('file.pickle'),
+                        os.path.getsize('file.json'))
+        snapshot.convert('file.pickle', 'converted.json')
+        with open('file.json') as f, open('converted.json') as g:
+            self.assertEqual(json.load(f), json.load(g))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -13,8 +13,8 @@ def teardown_db(exception):
 @app.route('/hbnb_filters', strict_slashes=False)
 def hbnb_filters():
     """Display a HTML page with HBNB filters."""
-    states = storage.all("State").values()
-    amenities = storage.all("Amenity").values()
+    states = storage.query("State", order_by='name', load='cities')
+    amenities = storage.query("Amenity", order_by='name')
     return render_template('10-hbnb_filters.html', states=states, amenities=amenities)
 
 
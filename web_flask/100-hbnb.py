@@ -13,7 +13,7 @@ def teardown_db(exception):
 @app.route('/places/<id>', strict_slashes=False)
 def show_place(id):
     """Show information about the place."""
-    place = storage.get("Place", id)
+    place = storage.get("Place", id, load='place')
     if place is None:
         return "Not found", 404
     return render_template('place.html', place=place)
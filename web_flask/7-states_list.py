@@ -84,10 +84,8 @@ def display_states():
     '''
         Displays all states with id
     '''
-    # Get all State objects
-    states = storage.all(State)
-    # Sort states alphabetically by name
-    states = sorted(states.values(), key=lambda state: state.name)
+    # Get all State objects, sorted alphabetically by name
+    states = storage.query(State, order_by='name')
     # Render template and pass states to it
     return render_template('7-states_list.html', states=states)
 
@@ -9,6 +9,12 @@ from models.city import City
 
 app = Flask(__name__)
 
+
+@app.teardown_appcontext
+def teardown_db(exception):
+    """Teardown the database session."""
+    storage.close()
+
 # Route to display "Hello HBNB!"
 @app.route('/', strict_slashes=False)
 def hello_hbnb():
@@ -57,16 +63,14 @@ def display_even_odd(n):
 
 @app.route('/states_list', strict_slashes=False)
 def display_states():
-    states = storage.all(State)
-    # Get the objects from {state_id: {objects}} and order by name A -Z
-    states = sorted(states.values(), key=lambda state: state.name)
+    # Get the states ordered by name A -Z
+    states = storage.query(State, order_by='name')
     return render_template('7-states_list.html', states=states)
 
 @app.route('/cities_by_states', strict_slashes=False)
 def display_cities_states():
-    states = storage.all(State)
-    # Get the objects from {state_id: {objects}} and order by name A -Z
-    states = sorted(states.values(), key=lambda state: state.name)
+    # fetch every state's cities in one extra query in DB mode
+    states = storage.query(State, order_by='name', load='cities')
     return render_template('8-cities_by_states.html', states=states)
 
 if __name__ == '__main__':
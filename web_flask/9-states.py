@@ -6,7 +6,7 @@ app = Flask(__name__)
 
 @app.route('/states', strict_slashes=False)
 def states():
-    states = storage.all("State").values()
+    states = storage.query("State", order_by='name')
     return render_template('10-states.html', states=states)
 
 
@@ -14,7 +14,7 @@ def states():
 def state_cities(state_id):
     state = storage.get("State", state_id)
     if state:
-        cities = sorted(state.cities, key=lambda x: x.name)
+        cities = state.cities
         return render_template('10-states.html', state=state, cities=cities)
     else:
         return "<h1>Not found!</h1>"